@@ -0,0 +1,323 @@
+"""
+Headless JSON API over the task and focus data, for the mobile client and integrations.
+
+    python -m api.server --port 8600
+    uvicorn api.server:app --port 8600 --workers 4   # each worker keeps its own read cache
+
+Every database call runs in the thread pool, so the event loop never blocks on SQLite.
+List and stats endpoints send an ETag built from the data versions they read and answer
+a matching If-None-Match with 304 before touching the data.
+"""
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from config.settings import (
+    DB_PATH, SHARDING_ENABLED, SHARD_USER_HEADER,
+    API_HOST, API_PORT, API_DEFAULT_PAGE_SIZE, API_MAX_PAGE_SIZE, API_RESPONSE_CACHE_ENTRIES, get_settings,
+)
+from modules.data_cache import CachedDatabaseManager, get_database
+from modules.database import TASK_SORT_ORDERS
+from modules.execution import TaskScheduler
+from modules.records import Task
+from modules.storage_router import get_router, proxy_user_id
+
+TASK_FIELDS: Tuple[str, ...] = ("name", "priority", "duration", "category", "notes")
+
+
+# --- HELPERS ---
+def _bool_param(request: Request, name: str) -> Optional[bool]:
+    value: Optional[str] = request.query_params.get(name)
+    if value is None or value == "":
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise HTTPException(400, f"{name} must be true or false")
+
+
+def _int_param(request: Request, name: str, default: int, low: int = 0, high: Optional[int] = None) -> int:
+    value: Optional[str] = request.query_params.get(name)
+    try:
+        number: int = default if value is None else int(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer")
+    if number < low or (high is not None and number > high):
+        raise HTTPException(400, f"{name} must be between {low} and {high}" if high is not None else f"{name} must be at least {low}")
+    return number
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    try:
+        body: Any = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Request body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(400, "Request body must be a JSON object")
+    return body
+
+
+def _task_values(body: Dict[str, Any], partial: bool) -> Dict[str, Any]:
+    """Validated task fields from a request body; with partial, only the fields present."""
+    values: Dict[str, Any] = {field: body[field] for field in TASK_FIELDS if field in body}
+    if not partial and not values.get("name"):
+        raise HTTPException(400, "name is required")
+    if "name" in values and (not isinstance(values["name"], str) or not values["name"].strip()):
+        raise HTTPException(400, "name must be a non-empty string")
+    priorities: List[str] = get_settings().priorities
+    if "priority" in values and values["priority"] not in priorities:
+        raise HTTPException(400, f"priority must be one of: {', '.join(priorities)}")
+    if "duration" in values and (not isinstance(values["duration"], int) or isinstance(values["duration"], bool) or values["duration"] <= 0):
+        raise HTTPException(400, "duration must be a positive integer (minutes)")
+    for field in ("category", "notes"):
+        if field in values and not isinstance(values[field], str):
+            raise HTTPException(400, f"{field} must be a string")
+    return values
+
+
+class TaskAPI:
+    """Route handlers bound to one database (or, with sharding, one router of user databases)."""
+    def __init__(
+        self,
+        db_path: Union[str, Path] = DB_PATH,
+        sharding: bool = SHARDING_ENABLED,
+        max_cached_bodies: int = API_RESPONSE_CACHE_ENTRIES,
+    ) -> None:
+        self.db_path: Path = Path(db_path)
+        self.sharding: bool = sharding
+        self.max_cached_bodies: int = max_cached_bodies
+        self._bodies: "OrderedDict[Hashable, Tuple[str, bytes]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def database(self, request: Request) -> CachedDatabaseManager:
+        """The caller's shard when sharding is enabled and a trusted proxy names a user, else the shared database."""
+        if self.sharding:
+            user_id: Optional[str] = proxy_user_id(request.headers)
+            if user_id:
+                return get_router().get(user_id)
+        return get_database(self.db_path)
+
+    async def conditional(
+        self,
+        request: Request,
+        versions: Iterable[str],
+        read: Callable[[CachedDatabaseManager], Any],
+    ) -> Response:
+        """
+        Serves read(db) as JSON with an ETag over the named data versions (and any queued
+        writes), or 304 when the client's If-None-Match still matches. Encoded bodies are
+        kept per URL until the ETag changes, so polling clients mostly cost one version read.
+        """
+        names: Tuple[str, ...] = tuple(versions)
+        client_tags: List[str] = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",") if tag.strip()]
+
+        def run() -> Tuple[str, Optional[bytes]]:
+            db: CachedDatabaseManager = self.database(request)
+            etag: str = '"' + "-".join(map(str, (*db.data_versions(names), db._writes.generation))) + '"'
+            if etag in client_tags or "*" in client_tags:
+                return etag, None
+            key: Hashable = (db.db_path, request.url.path, request.url.query)
+            with self._lock:
+                entry: Optional[Tuple[str, bytes]] = self._bodies.get(key)
+                if entry is not None and entry[0] == etag:
+                    self._bodies.move_to_end(key)
+                    return etag, entry[1]
+            body: bytes = json.dumps(read(db), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            with self._lock:
+                self._bodies[key] = (etag, body)
+                self._bodies.move_to_end(key)
+                while len(self._bodies) > self.max_cached_bodies:
+                    self._bodies.popitem(last=False)
+            return etag, body
+
+        etag, body = await run_in_threadpool(run)
+        headers: Dict[str, str] = {"ETag": etag, "Cache-Control": "no-cache"}
+        if self.sharding:
+            headers["Vary"] = SHARD_USER_HEADER
+        if body is None:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    # --- TASKS ---
+    async def list_tasks(self, request: Request) -> Response:
+        filters: Dict[str, Any] = {
+            "completed": _bool_param(request, "completed"),
+            "category": request.query_params.get("category") or None,
+            "priority": request.query_params.get("priority") or None,
+        }
+        order_by: Optional[str] = request.query_params.get("order_by") or None
+        if order_by is not None and order_by not in TASK_SORT_ORDERS:
+            raise HTTPException(400, f"order_by must be one of: {', '.join(TASK_SORT_ORDERS)}")
+        limit: int = _int_param(request, "limit", API_DEFAULT_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+        offset: int = _int_param(request, "offset", 0)
+
+        def read(db: CachedDatabaseManager) -> Dict[str, Any]:
+            tasks: List[Task] = db.get_tasks(**filters, order_by=order_by, limit=limit, offset=offset)
+            return {"tasks": [t.to_dict() for t in tasks], "total": db.count_tasks(**filters), "limit": limit, "offset": offset}
+
+        return await self.conditional(request, ("tasks",), read)
+
+    async def prioritized_tasks(self, request: Request) -> Response:
+        """Incomplete tasks in ExecutionEngine.prioritize_tasks order, from the shared incremental scheduler."""
+        limit: int = _int_param(request, "limit", API_DEFAULT_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+
+        def read(db: CachedDatabaseManager) -> Dict[str, Any]:
+            scheduler: TaskScheduler = db.get_scheduler()
+            return {"tasks": [t.to_dict() for t in scheduler.top(limit)], "remaining_minutes": scheduler.remaining_capacity}
+
+        return await self.conditional(request, ("tasks",), read)
+
+    async def search_tasks(self, request: Request) -> Response:
+        query: str = request.query_params.get("q", "").strip()
+        if not query:
+            raise HTTPException(400, "q is required")
+        limit: int = _int_param(request, "limit", 50, 1, API_MAX_PAGE_SIZE)
+        filters: Dict[str, Any] = {"completed": _bool_param(request, "completed")}
+        return await self.conditional(
+            request, ("tasks",),
+            lambda db: {"tasks": [t.to_dict() for t in db.search_tasks(query, filters, limit)]},
+        )
+
+    async def get_task(self, request: Request) -> Response:
+        task_id: str = request.path_params["task_id"]
+        task: Optional[Task] = await run_in_threadpool(lambda: self.database(request).get_task(task_id))
+        if task is None:
+            raise HTTPException(404, "Task not found")
+        return JSONResponse(task.to_dict())
+
+    async def create_task(self, request: Request) -> Response:
+        values: Dict[str, Any] = _task_values(await _json_body(request), partial=False)
+
+        def write() -> Optional[Task]:
+            db: CachedDatabaseManager = self.database(request)
+            return db.get_task(db.add_task(**values))
+
+        task: Optional[Task] = await run_in_threadpool(write)
+        return JSONResponse(task.to_dict(), status_code=201, headers={"Location": f"/tasks/{task.id}"})
+
+    async def update_task(self, request: Request) -> Response:
+        """Partial update: any task fields plus "completed"."""
+        task_id: str = request.path_params["task_id"]
+        body: Dict[str, Any] = await _json_body(request)
+        values: Dict[str, Any] = _task_values(body, partial=True)
+        if "completed" in body and not isinstance(body["completed"], bool):
+            raise HTTPException(400, "completed must be true or false")
+
+        def write() -> Optional[Task]:
+            db: CachedDatabaseManager = self.database(request)
+            task: Optional[Task] = db.get_task(task_id)
+            if task is None:
+                return None
+            if values:
+                merged: Dict[str, Any] = {field: getattr(task, field) for field in TASK_FIELDS}
+                merged.update(values)
+                db.update_task_details(task_id, **merged)
+            if "completed" in body:
+                db.update_task_status(task_id, body["completed"])
+            return db.get_task(task_id)
+
+        task: Optional[Task] = await run_in_threadpool(write)
+        if task is None:
+            raise HTTPException(404, "Task not found")
+        return JSONResponse(task.to_dict())
+
+    async def delete_task(self, request: Request) -> Response:
+        task_id: str = request.path_params["task_id"]
+
+        def write() -> bool:
+            db: CachedDatabaseManager = self.database(request)
+            if db.get_task(task_id) is None:
+                return False
+            db.delete_task(task_id)
+            return True
+
+        if not await run_in_threadpool(write):
+            raise HTTPException(404, "Task not found")
+        return Response(status_code=204)
+
+    # --- FOCUS SESSIONS ---
+    async def log_focus_session(self, request: Request) -> Response:
+        body: Dict[str, Any] = await _json_body(request)
+        task_id: Any = body.get("task_id")
+        minutes: Any = body.get("duration_minutes")
+        if task_id is not None and not isinstance(task_id, str):
+            raise HTTPException(400, "task_id must be a string or null")
+        if not isinstance(minutes, int) or isinstance(minutes, bool) or minutes <= 0:
+            raise HTTPException(400, "duration_minutes must be a positive integer")
+        await run_in_threadpool(lambda: self.database(request).log_focus_session(task_id, minutes))
+        return JSONResponse({"task_id": task_id, "duration_minutes": minutes}, status_code=201)
+
+    async def list_focus_sessions(self, request: Request) -> Response:
+        since: Optional[str] = request.query_params.get("since") or None
+        until: Optional[str] = request.query_params.get("until") or None
+        task_id: Optional[str] = request.query_params.get("task_id") or None
+        limit: int = _int_param(request, "limit", API_DEFAULT_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+        return await self.conditional(
+            request, ("focus",),
+            lambda db: {"sessions": [s.to_dict() for s in db.get_focus_sessions(since, until, task_id, limit)]},
+        )
+
+    async def focus_stats(self, request: Request) -> Response:
+        since: Optional[str] = request.query_params.get("since") or None
+        until: Optional[str] = request.query_params.get("until") or None
+        return await self.conditional(request, ("focus",), lambda db: {"days": db.get_focus_stats(since, until)})
+
+    async def focus_breakdown(self, request: Request) -> Response:
+        by: str = request.query_params.get("by", "category")
+        if by not in ("category", "task"):
+            raise HTTPException(400, "by must be category or task")
+        since: Optional[str] = request.query_params.get("since") or None
+        until: Optional[str] = request.query_params.get("until") or None
+        return await self.conditional(request, ("focus", "tasks"), lambda db: {"breakdown": db.get_focus_breakdown(by, since, until)})
+
+    async def health(self, request: Request) -> Response:
+        return JSONResponse({"status": "ok"})
+
+
+async def _http_error(request: Request, exc: HTTPException) -> Response:
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+
+def create_app(db_path: Union[str, Path] = DB_PATH, sharding: bool = SHARDING_ENABLED) -> Starlette:
+    """Builds the ASGI app over the database at db_path (or the user shards)."""
+    api: TaskAPI = TaskAPI(db_path, sharding)
+    routes: List[Route] = [
+        Route("/health", api.health),
+        Route("/tasks", api.list_tasks),
+        Route("/tasks", api.create_task, methods=["POST"]),
+        Route("/tasks/prioritized", api.prioritized_tasks),
+        Route("/tasks/search", api.search_tasks),
+        Route("/tasks/{task_id}", api.get_task),
+        Route("/tasks/{task_id}", api.update_task, methods=["PATCH"]),
+        Route("/tasks/{task_id}", api.delete_task, methods=["DELETE"]),
+        Route("/focus-sessions", api.list_focus_sessions),
+        Route("/focus-sessions", api.log_focus_session, methods=["POST"]),
+        Route("/focus/stats", api.focus_stats),
+        Route("/focus/breakdown", api.focus_breakdown),
+    ]
+    return Starlette(routes=routes, exception_handlers={HTTPException: _http_error})
+
+
+# For "uvicorn api.server:app"; databases are only opened by the first request
+app: Starlette = create_app()
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the JSON API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to the SQLite database")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.db), host=args.host, port=args.port, log_level="warning")
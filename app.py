@@ -1,12 +1,16 @@
 import streamlit as st
+from config.settings import get_settings
+
+# Validated once per process; a bad setting fails here instead of deep inside a page
+settings = get_settings()
 
 st.set_page_config(
-    page_title="Apex Productivity",
-    page_icon="🚀",
+    page_title=settings.app_title,
+    page_icon=settings.app_icon,
     layout="wide"
 )
 
-st.title("🚀 Apex Productivity Dashboard")
+st.title(f"{settings.app_icon} {settings.app_title} Dashboard")
 
 st.markdown("""
 ### Welcome to your personal command center.
@@ -15,6 +19,7 @@ Use the sidebar to navigate:
 - **📝 Plan**: Manage tasks and get AI insights.
 - **⏱️ Focus**: Execute tasks with a Pomodoro timer.
 - **📊 Review**: Analyze your habits and progress.
+- **🩺 Diagnostics**: Inspect page, database and AI latencies.
 
 #### Quick Actions
 """)
@@ -34,3 +39,22 @@ if "GROQ_API_KEY" not in st.secrets and not os.getenv("GROQ_API_KEY"):
     st.info("Tip: Set your GROQ_API_KEY in `.env` or `.streamlit/secrets.toml` to enable AI features.")
 else:
     st.success("AI Features Enabled 🟢")
+
+# --- MORNING BRIEFING ---
+st.markdown("#### ☀️ Morning Briefing")
+BRIEFING_TITLES = {"daily_planning": "🗓️ Today's Plan", "habit_tracking": "🔁 Habits", "recommendations": "💡 Recommendations"}
+with st.form("morning_briefing"):
+    mood = st.text_input("How are you feeling today?", placeholder="e.g. rested, a bit scattered")
+    briefing_requested = st.form_submit_button("Get My Briefing")
+if briefing_requested:
+    # Imported on demand so the home page stays light to load
+    from modules.briefing import BRIEFING_PROMPTS, morning_briefing_requests
+    from modules.groq_client import get_groq_client
+    from modules.storage_router import get_session_database
+
+    with st.spinner("Preparing your briefing..."):
+        # The three prompts run concurrently: the wait is the slowest one, not the sum
+        answers = get_groq_client().get_completions(morning_briefing_requests(get_session_database(), mood, settings))
+    for prompt_key in BRIEFING_PROMPTS:
+        with st.expander(BRIEFING_TITLES[prompt_key], expanded=True):
+            st.markdown(answers[prompt_key])
@@ -0,0 +1,81 @@
+"""
+Cold-start import profile for the app entry point, pages and heavy modules.
+
+Each target is imported in a fresh interpreter under `python -X importtime`, so
+nothing is shared between measurements.
+
+    python -m benchmarks.bench_imports --repeat 5 --output imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> statements executed in the fresh interpreter. Pages are listed by the
+# modules they import at the top level, which is what cold start pays for.
+TARGETS: Dict[str, str] = {
+    "streamlit": "import streamlit",
+    "config.settings": "import config.settings",
+    "modules.database": "import modules.database",
+    "modules.data_cache": "import modules.data_cache",
+    "modules.groq_client": "import modules.groq_client",
+    "modules.analytics": "import modules.analytics",
+    "components.charts": "import components.charts",
+    "page:Plan": "import modules.context_builder, modules.data_cache, modules.execution, modules.groq_client, modules.instrumentation, modules.records, modules.storage_router",
+    "page:Focus": "import modules.database, modules.timer, modules.instrumentation, modules.records, modules.storage_router, components.timer",
+    "page:Review": "import altair, modules.database, modules.analytics, modules.groq_client, modules.habits, modules.instrumentation, modules.storage_router, components.charts",
+}
+
+
+def profile(statement: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Returns the total import time in ms and the five slowest top-level imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    top_level: List[Tuple[str, float]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us |   cumulative_us | <indent>package"
+        _, cumulative, name = line.split("|", 2)
+        # Top-level imports are the ones not indented beyond the column's single space
+        if not name[1:].startswith(" "):
+            top_level.append((name.strip(), int(cumulative) / 1000))
+    total_ms: float = sum(ms for _, ms in top_level)
+    return total_ms, sorted(top_level, key=lambda item: item[1], reverse=True)[:5]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--only", help="Comma-separated target names")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    names: List[str] = args.only.split(",") if args.only else list(TARGETS)
+    results: List[Dict] = []
+    for name in names:
+        runs = [profile(TARGETS[name]) for _ in range(args.repeat)]
+        totals: List[float] = [total for total, _ in runs]
+        results.append({
+            "target": name,
+            "min_ms": round(min(totals), 2),
+            "median_ms": round(statistics.median(totals), 2),
+            "slowest": [{"module": module, "ms": round(ms, 2)} for module, ms in runs[-1][1]],
+        })
+        print(f"{name:<22} median {results[-1]['median_ms']:>9.2f} ms   min {results[-1]['min_ms']:>9.2f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
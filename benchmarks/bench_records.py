@@ -0,0 +1,101 @@
+"""
+Task records (modules/records.py) against the per-row dicts get_tasks used to return.
+
+For each size, loads every task both ways from the same synthetic database and reports
+the memory held by the list (tracemalloc), load time and prioritize_tasks sort time.
+
+    python -m benchmarks.bench_records --sizes 10000,100000 --output records.json
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from benchmarks.synthetic import generate_database
+from modules.database import DatabaseManager
+from modules.execution import ExecutionEngine
+from modules.records import PRIORITY_RANKS
+
+
+def dict_schedule_key(task: Dict[str, Any]) -> Tuple[bool, int, int]:
+    """The sort key prioritize_tasks used on dict rows."""
+    return (
+        bool(task.get("completed", False)),
+        PRIORITY_RANKS.get(task.get("priority", "Low"), 3),
+        task.get("duration") if task.get("duration") else 60,
+    )
+
+
+def load_dicts(db: DatabaseManager) -> List[Dict[str, Any]]:
+    with db.transaction() as conn:
+        return [dict(row) for row in conn.execute("SELECT * FROM tasks").fetchall()]
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """Median wall time in ms."""
+    runs: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(runs), 3)
+
+
+def held_bytes(load: Callable[[], List[Any]]) -> int:
+    """Bytes still allocated by the loaded list once loading is done."""
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    rows: List[Any] = load()
+    held: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del rows
+    return held
+
+
+def bench_size(size: int, repeat: int, workdir: Path) -> List[Dict[str, Any]]:
+    db, _ = generate_database(workdir / f"records_{size}.db", size, 0)
+    engine: ExecutionEngine = ExecutionEngine()
+    dicts: List[Dict[str, Any]] = load_dicts(db)
+    records = db.get_tasks()
+    results: List[Dict[str, Any]] = []
+    for path, load, sort in (
+        ("dict", lambda: load_dicts(db), lambda: sorted(dicts, key=dict_schedule_key)),
+        ("record", db.get_tasks, lambda: engine.prioritize_tasks(records)),
+    ):
+        held: int = held_bytes(load)
+        results.append({
+            "size": size,
+            "path": path,
+            "bytes_per_task": round(held / size, 1),
+            "load_ms": timed(load, repeat),
+            "sort_ms": timed(sort, repeat),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated task counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s):
+            results += bench_size(size, args.repeat, Path(tmp))
+            for row in results[-2:]:
+                print(f"{row['size']:>9} {row['path']:<7} {row['bytes_per_task']:>9.1f} B/task"
+                      f"   load {row['load_ms']:>9.2f} ms   sort {row['sort_ms']:>9.2f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], "sqlite": sqlite3.sqlite_version, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
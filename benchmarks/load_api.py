@@ -0,0 +1,157 @@
+"""
+Local load test for the JSON API (api/server.py).
+
+Starts the server in a subprocess over a synthetic database (or targets --url), then
+keeps --concurrency async clients requesting a mix of read endpoints for --duration
+seconds. Half of the clients revalidate with If-None-Match, like a polling mobile app.
+Clients are bare keep-alive HTTP/1.1 connections (asyncio streams), so on a small box
+the load generator takes as little CPU away from the server as possible.
+
+    python -m benchmarks.load_api --tasks 10000 --concurrency 64 --duration 10
+    python -m benchmarks.load_api --url http://127.0.0.1:8600 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from benchmarks.synthetic import generate_database
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Paths requested in rotation by every client
+ENDPOINTS: List[str] = [
+    "/tasks?limit=50",
+    "/tasks?completed=false&order_by=priority&limit=50",
+    "/tasks/prioritized?limit=20",
+    "/focus/stats",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: Path, port: int) -> subprocess.Popen:
+    """Runs python -m api.server in a subprocess and waits until it accepts connections."""
+    process: subprocess.Popen = subprocess.Popen(
+        [sys.executable, "-m", "api.server", "--db", str(db_path), "--port", str(port)],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    deadline: float = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("API server exited during startup")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not start within 30s")
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, etag: Optional[str]) -> Tuple[int, Optional[str]]:
+    """Sends one GET on a keep-alive connection and returns (status, ETag)."""
+    lines: List[str] = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    head: bytes = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers: Dict[str, str] = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split()[1]), headers.get("etag")
+
+
+async def client(host: str, port: int, index: int, stop_at: float, revalidate: bool) -> List[Tuple[float, int]]:
+    """Requests ENDPOINTS in rotation until stop_at; returns (latency seconds, status) per request."""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags: Dict[str, str] = {}
+    samples: List[Tuple[float, int]] = []
+    i: int = index
+    try:
+        while time.perf_counter() < stop_at:
+            path: str = ENDPOINTS[i % len(ENDPOINTS)]
+            i += 1
+            start: float = time.perf_counter()
+            status, etag = await request(reader, writer, f"{host}:{port}", path, etags.get(path) if revalidate else None)
+            samples.append((time.perf_counter() - start, status))
+            if etag:
+                etags[path] = etag
+    finally:
+        writer.close()
+    return samples
+
+
+async def run_load(url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    target = urlsplit(url)
+    host: str = target.hostname or "127.0.0.1"
+    port: int = target.port or 80
+    reader, writer = await asyncio.open_connection(host, port)
+    await request(reader, writer, f"{host}:{port}", ENDPOINTS[0], None)  # Warm the server's caches
+    writer.close()
+    stop_at: float = time.perf_counter() + duration
+    results = await asyncio.gather(*(client(host, port, n, stop_at, revalidate=n % 2 == 1) for n in range(concurrency)))
+    samples: List[Tuple[float, int]] = [sample for result in results for sample in result]
+    latencies: List[float] = sorted(latency * 1000 for latency, _ in samples)
+    statuses: Dict[str, int] = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(samples),
+        "requests_per_second": round(len(samples) / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2),
+        "statuses": statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--tasks", type=int, default=10_000, help="Synthetic tasks in the generated database")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    process: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as tmp:
+        url: str = args.url
+        if not url:
+            db_path: Path = Path(tmp) / "load.db"
+            generate_database(db_path, args.tasks, args.tasks * 2)
+            port: int = _free_port()
+            process = start_server(db_path, port)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            result: Dict[str, Any] = asyncio.run(run_load(url, args.concurrency, args.duration))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print(f"{result['requests']} requests  {result['requests_per_second']:.0f} req/s  "
+          f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  {result['statuses']}")
+    if args.output:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], **vars(args), "result": result}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmarks for the database, engine and analytics hot paths on synthetic data.
+
+    python -m benchmarks.run --sizes 1000,10000,100000 --output results.json
+    python -m benchmarks.run --sizes 1000 --compare results.json
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.synthetic import generate_database
+from modules.context_builder import ContextBuilder
+from modules.execution import ExecutionEngine, TaskScheduler
+from modules.records import Task
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Runs func `repeat` times and returns timings in milliseconds."""
+    timings: List[float] = []
+    for _ in range(repeat):
+        started: float = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "runs": repeat,
+    }
+
+
+def bench_size(size: int, sessions_per_task: float, repeat: int, workdir: Path) -> List[Dict[str, Any]]:
+    """Benchmarks every hot path against a fresh database of `size` tasks."""
+    results: List[Dict[str, Any]] = []
+
+    def record(name: str, func: Callable[[], Any], runs: int = repeat) -> None:
+        results.append({"size": size, "name": name, **measure(func, runs)})
+
+    started: float = time.perf_counter()
+    db, task_ids = generate_database(workdir / f"bench_{size}.db", size, int(size * sessions_per_task))
+    results.append({"size": size, "name": "generate_database", "min_ms": round((time.perf_counter() - started) * 1000, 1), "runs": 1})
+    rng: random.Random = random.Random(size)
+    engine: ExecutionEngine = ExecutionEngine()
+
+    # DatabaseManager reads
+    record("db.get_tasks.all", db.get_tasks)
+    record("db.get_tasks.incomplete_page", lambda: db.get_tasks(completed=False, order_by="priority", limit=50))
+    record("db.count_tasks", db.count_tasks)
+    record("db.get_focus_stats", db.get_focus_stats)
+    record("db.get_focus_breakdown.category", lambda: db.get_focus_breakdown("category"))
+
+    # DatabaseManager writes (one transaction each)
+    crud_runs: int = max(repeat, 50)
+    record("db.add_task", lambda: db.add_task("benchmark task", "High", 25, "Work"), crud_runs)
+    record("db.update_task_status", lambda: db.update_task_status(rng.choice(task_ids), rng.random() < 0.5), crud_runs)
+    record("db.update_task_details", lambda: db.update_task_details(rng.choice(task_ids), "renamed", "Low", 30, "Study"), crud_runs)
+    record("db.log_focus_session", lambda: db.log_focus_session(rng.choice(task_ids), 25), crud_runs)
+    deletable: List[str] = [db.add_task("to delete") for _ in range(crud_runs)]
+    record("db.delete_task", lambda: db.delete_task(deletable.pop()), crud_runs)
+
+    # Write queue: 30 checkbox toggles in a row, then the batched commit
+    def queued_toggles() -> None:
+        for task_id in rng.sample(task_ids, min(30, len(task_ids))):
+            db.queue_task_status(task_id, rng.random() < 0.5)
+        db.flush_writes()
+    record("db.queue_task_status.30_and_flush", queued_toggles)
+
+    # ExecutionEngine
+    tasks: List[Task] = db.get_tasks()
+    record("engine.prioritize_tasks", lambda: engine.prioritize_tasks(tasks))
+    record("engine.calculate_capacity", lambda: engine.calculate_capacity(tasks))
+    record("engine.plan_day", lambda: engine.plan_day(tasks))
+    scheduler: TaskScheduler = engine.build_scheduler(tasks)
+    record("scheduler.build", lambda: engine.build_scheduler(tasks))
+    record("scheduler.complete", lambda: scheduler.complete(rng.choice(task_ids), rng.random() < 0.5), crud_runs)
+    record("scheduler.top_10", lambda: scheduler.top(10), crud_runs)
+    record("engine.plan_day_scheduler", lambda: engine.plan_day(scheduler))
+    schedule = engine.plan_day(scheduler)
+    record("context_builder.daily_planning", lambda: ContextBuilder(engine).daily_planning(schedule))
+
+    # Review page aggregations, headless (pandas is optional here)
+    try:
+        from modules.analytics import ReviewAnalytics
+    except ImportError:
+        results.append({"size": size, "name": "analytics.review_report", "skipped": "pandas not installed"})
+    else:
+        analytics: ReviewAnalytics = ReviewAnalytics(db)
+        record("analytics.review_report", lambda: analytics._build_report(datetime.now().date()))
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Prints median (or min) ratios against a previous results file."""
+    baseline: Dict[Any, Dict[str, Any]] = {(r["size"], r["name"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    for result in current:
+        previous: Optional[Dict[str, Any]] = baseline.get((result["size"], result["name"]))
+        metric: str = "median_ms" if "median_ms" in result else "min_ms"
+        if not previous or metric not in result or not previous.get(metric):
+            continue
+        ratio: float = result[metric] / previous[metric]
+        flag: str = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{result['size']:>9} {result['name']:<36} {previous[metric]:>10.3f} -> {result[metric]:>10.3f} ms  x{ratio:.2f}{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated task counts (e.g. 1000,100000,1000000)")
+    parser.add_argument("--sessions-per-task", type=float, default=2.0, help="Focus sessions generated per task")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per read benchmark")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--workdir", help="Keep the generated databases in this directory")
+    args = parser.parse_args()
+
+    sizes: List[int] = [int(s) for s in args.sizes.split(",") if s]
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir: Path = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        for size in sizes:
+            results += bench_size(size, args.sessions_per_task, args.repeat, workdir)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sessions_per_task": args.sessions_per_task,
+        },
+        "results": results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    payload: str = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+    elif not args.compare:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from config.settings import get_settings
+from modules.database import DatabaseManager, get_connection_pool
+
+WORDS: List[str] = ["review", "draft", "plan", "email", "report", "refactor", "study", "call", "budget", "workout",
+                    "read", "design", "deploy", "research", "invoice", "meeting", "notes", "cleanup", "interview", "roadmap"]
+DURATIONS: List[int] = [5, 10, 15, 25, 30, 45, 60, 90, 120]
+
+
+def _iter_tasks(count: int, days: int, rng: random.Random, now: datetime) -> Iterator[Dict[str, Any]]:
+    priorities: List[str] = get_settings().priorities
+    categories: Tuple[str, ...] = get_settings().task_categories
+    for _ in range(count):
+        created: datetime = now - timedelta(days=rng.random() * days)
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "name": " ".join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize(),
+            "priority": rng.choice(priorities),
+            "duration": rng.choice(DURATIONS),
+            "completed": rng.random() < 0.7,  # Long-lived backlogs are mostly done
+            "created_at": created.isoformat(),
+            "category": rng.choice(categories),
+        }
+
+
+def generate_database(
+    db_path: Union[str, Path],
+    tasks: int,
+    sessions: int,
+    days: int = 365,
+    seed: int = 42,
+    chunk_size: int = 50_000,
+) -> Tuple[DatabaseManager, List[str]]:
+    """
+    Creates (or extends) a database with synthetic tasks and focus sessions spread over `days`.
+    Returns the manager and the generated task ids. Deterministic for a given seed.
+    """
+    rng: random.Random = random.Random(seed)
+    now: datetime = datetime.now()
+    db: DatabaseManager = DatabaseManager(db_path)
+
+    task_ids: List[str] = []
+    batch: List[Dict[str, Any]] = []
+    for task in _iter_tasks(tasks, days, rng, now):
+        task_ids.append(task["id"])
+        batch.append(task)
+        if len(batch) >= chunk_size:
+            db.add_tasks(batch)
+            batch = []
+    if batch:
+        db.add_tasks(batch)
+
+    pool = get_connection_pool(db_path)
+    remaining: int = sessions
+    while remaining > 0:
+        size: int = min(chunk_size, remaining)
+        rows: List[Tuple[Any, ...]] = []
+        for _ in range(size):
+            start: datetime = now - timedelta(days=rng.random() * days)
+            task_id = rng.choice(task_ids) if task_ids and rng.random() < 0.9 else None
+            rows.append((str(uuid.UUID(int=rng.getrandbits(128), version=4)), task_id, start.isoformat(), rng.choice([15, 25, 25, 50])))
+        with pool.connection() as conn:
+            conn.executemany("INSERT INTO focus_sessions (id, task_id, start_time, duration_minutes) VALUES (?, ?, ?, ?)", rows)
+        remaining -= size
+    if sessions:
+        db.rebuild_focus_rollup()
+    return db, task_ids
@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
-from config.settings import PRIMARY_COLOR, SECONDARY_COLOR
+from config.settings import get_settings
+
+# pandas and altair are imported inside the render functions so that importing
+# this module does not add their load time to pages that never draw a chart.
 
 def render_habit_chart(habit_data):
     """
@@ -12,10 +13,13 @@ def render_habit_chart(habit_data):
         st.info("No habit data available yet.")
         return
 
+    import pandas as pd
+    import altair as alt
+
     df = pd.DataFrame(habit_data)
     
-    chart = alt.Chart(df).mark_bar(color=PRIMARY_COLOR).encode(
-        x='day',
+    chart = alt.Chart(df).mark_bar(color=get_settings().primary_color).encode(
+        x=alt.X('day', sort=None), # Keep the given day order instead of sorting alphabetically
         y='completed',
         tooltip=['day', 'completed', 'total']
     ).properties(
@@ -33,9 +37,12 @@ def render_focus_chart(focus_data):
         st.info("No focus data available yet.")
         return
 
+    import pandas as pd
+    import altair as alt
+
     df = pd.DataFrame(focus_data)
     
-    chart = alt.Chart(df).mark_line(color=SECONDARY_COLOR).encode(
+    chart = alt.Chart(df).mark_line(color=get_settings().secondary_color).encode(
         x='date',
         y='minutes',
         tooltip=['date', 'minutes']
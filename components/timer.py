@@ -0,0 +1,44 @@
+import json
+import streamlit.components.v1 as components
+
+# Public domain beep played by the browser when the countdown reaches zero
+AUDIO_URL = "https://www.soundjay.com/button/button-3.wav"
+
+def render_countdown(remaining_seconds: int, running: bool, mode: str) -> None:
+    """
+    Renders the timer display as a browser-side countdown.
+    The page only needs to rerun on start, pause, completion and logging; the seconds tick in JavaScript.
+    """
+    html = f"""
+    <div style="font-family: 'Source Sans Pro', sans-serif; text-align: center;">
+        <h1 id="countdown" style="font-size: 80px; margin: 0;"></h1>
+        <p style="margin: 0;">{mode}</p>
+    </div>
+    <audio id="timer_beep" src="{AUDIO_URL}" type="audio/wav"></audio>
+    <script>
+        const running = {json.dumps(running)};
+        const endAt = Date.now() + {int(remaining_seconds)} * 1000;
+        const display = document.getElementById("countdown");
+        const beep = document.getElementById("timer_beep");
+        beep.volume = 0.5;
+
+        function render(seconds) {{
+            const mins = String(Math.floor(seconds / 60)).padStart(2, "0");
+            const secs = String(seconds % 60).padStart(2, "0");
+            display.textContent = mins + ":" + secs;
+        }}
+
+        render({int(remaining_seconds)});
+        if (running) {{
+            const interval = setInterval(() => {{
+                const left = Math.max(0, Math.ceil((endAt - Date.now()) / 1000));
+                render(left);
+                if (left === 0) {{
+                    clearInterval(interval);
+                    beep.play().catch(() => {{}});
+                }}
+            }}, 250);
+        }}
+    </script>
+    """
+    components.html(html, height=150)
@@ -1,19 +1,27 @@
 # Production-grade Groq prompts for the productivity app
 
 GROQ_PROMPTS = {
+    # Placeholders stay at the end so the instruction prefix is byte-identical across requests (provider prompt caching)
     "daily_planning": """
-    You are an expert productivity coach. Your goal is to help the user plan their day effectively.
-    
-    Given the following list of tasks (including their priority, duration, and category) and user context:
-    {user_context}
+    You are an expert productivity coach. The user's day has already been time-blocked by a local scheduler
+    (a workday of Pomodoro focus blocks and breaks, grouped by category). Do not rebuild or re-time the schedule.
+    Deferred tasks may be listed individually or summarized per category when the backlog is long.
 
-    Please provide a structured daily plan that includes:
-    1.  **Top 3 Priorities**: The most important tasks to complete today, considering their priority and category.
-    2.  **Time Blocking Schedule**: A suggested schedule for the day (assuming an {target_daily_hours}-hour workday), allocating time for deep work and shallow work, and grouping similar categories if beneficial.
+    Please provide, briefly:
+    1.  **Top 3 Priorities**: The most important scheduled tasks and why.
+    2.  **How to Run the Day**: A short narration of the blocks (deep vs. shallow work, when to protect focus).
     3.  **Task Dependency Analysis**: Identify if any tasks block others.
     4.  **Motivation**: A short, punchy motivational quote or advice relevant to the user's load.
 
     Output the response in clean Markdown format.
+
+    Workday: {target_daily_hours} hours
+
+    Today's schedule (+h:mm from the start of the workday, then minutes):
+    {schedule}
+
+    Tasks that did not fit today:
+    {user_context}
     """,
 
     "habit_tracking": """
@@ -1,5 +1,8 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import List, Tuple
 
 # Base Directory
 BASE_DIR = Path(__file__).parent.parent
@@ -9,6 +12,31 @@ DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(exist_ok=True)
 DB_PATH = DATA_DIR / "productivity.db"
 
+# --- DATABASE ---
+DB_POOL_SIZE = 8  # Idle connections kept per database file
+DB_BUSY_TIMEOUT_MS = 5000
+DB_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+DB_CACHE_SIZE_KB = 16 * 1024
+DATA_CACHE_MAX_ENTRIES = 256  # Memoized read results kept by modules/data_cache.py
+WRITE_QUEUE_FLUSH_SECONDS = 0.5  # Delay before queued task edits and focus sessions are committed
+
+# --- MULTI-USER SHARDING (modules/storage_router.py) ---
+SHARDING_ENABLED = os.getenv("APEX_SHARDING", "0") == "1"  # Off: every session uses DB_PATH
+SHARD_DIR = DATA_DIR / "shards"
+SHARD_MODE = "user"  # "user": one file per user; "bucket": users hashed into SHARD_BUCKETS files
+SHARD_BUCKETS = 16
+SHARD_MAX_OPEN = 32  # Shard handles kept open; the least recently used one is flushed and closed
+SHARD_USER_HEADER = "X-Forwarded-User"  # Set by the reverse proxy when Streamlit auth is not used
+SHARD_TRUST_USER_HEADER = os.getenv("APEX_TRUST_USER_HEADER", "0") == "1"  # Only behind a proxy that sets (and strips) the header
+SHARD_AGGREGATE_WORKERS = 4
+
+# --- HTTP API (api/server.py) ---
+API_HOST = "127.0.0.1"
+API_PORT = 8600
+API_DEFAULT_PAGE_SIZE = 100  # Tasks per response when the client sends no limit
+API_MAX_PAGE_SIZE = 1000
+API_RESPONSE_CACHE_ENTRIES = 512  # Encoded list responses kept per URL until their ETag changes
+
 # --- APP CONFIG ---
 APP_TITLE = "Apex Productivity"
 APP_ICON = "🚀"
@@ -17,13 +45,41 @@ APP_ICON = "🚀"
 POMODORO_DURATION = 25
 SHORT_BREAK_DURATION = 5
 LONG_BREAK_DURATION = 15
+POMODOROS_BEFORE_LONG_BREAK = 4
 
 # --- CAPACITY & PLANNING ---
 TARGET_DAILY_HOURS = 8
 TARGET_DAILY_MINUTES = TARGET_DAILY_HOURS * 60
+SCHEDULER_LOOKAHEAD = 8  # Tasks considered by the knapsack step when the day is nearly full
+PLAN_PAGE_SIZES = [10, 25, 50, 100]  # Tasks rendered per page on the Plan page
+PLAN_DEFAULT_PAGE_SIZE = 25
+
+# --- ARCHIVE (modules/archive.py) ---
+ARCHIVE_AFTER_DAYS = 90  # Completed tasks and focus sessions older than this move to Parquet
+
+# --- BULK IMPORT / EXPORT ---
+BULK_CHUNK_SIZE = 5000  # Rows per transaction
 
 # --- AI & MODELS ---
 GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_MAX_CONCURRENCY = 3  # Parallel requests in GroqClient.get_completions (e.g. the morning briefing)
+GROQ_REQUEST_TIMEOUT_SECONDS = 30
+GROQ_MAX_RETRIES = 3  # Retries on rate-limit, connection, timeout and 5xx errors
+GROQ_RETRY_BASE_DELAY_SECONDS = 1.0
+GROQ_MAX_RETRY_AFTER_SECONDS = 10.0  # Longest Retry-After honored before giving up on the wait
+PLANNING_CONTEXT_TOKEN_BUDGET = 1500  # Tokens of schedule + deferred-task context sent with daily_planning
+PLANNING_TASK_NAME_MAX_CHARS = 80  # Longer task names are truncated in prompt context
+
+# --- AI RESPONSE CACHE ---
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = DATA_DIR / "llm_cache.db"
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 500
+
+# --- DIAGNOSTICS ---
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_BUFFER_SIZE = 5000  # Most recent measurements kept in memory
+SLOW_QUERY_MS = 50  # Database calls at least this slow are listed (with their arguments) on the Diagnostics page
 
 # --- THEME & UI ---
 # Priority colors for badges
@@ -37,7 +93,91 @@ STATUS_COLORS = {
     "Done": "green",
     "Todo": "orange",
 }
+# Chart accent colors
+PRIMARY_COLOR = "#4F8BF9"
+SECONDARY_COLOR = "#FF4B4B"
 
 # --- TASK CATEGORIES ---
 TASK_CATEGORIES = ["Work", "Personal", "Study", "Health", "Finance", "Uncategorized"]
 
+
+# --- VALIDATED SETTINGS ---
+@dataclass(frozen=True)
+class Settings:
+    """Immutable, validated snapshot of the module-level settings above."""
+    app_title: str
+    app_icon: str
+    db_path: Path
+    pomodoro_duration: int
+    short_break_duration: int
+    long_break_duration: int
+    pomodoros_before_long_break: int
+    target_daily_hours: int
+    target_daily_minutes: int
+    groq_model: str
+    groq_max_concurrency: int
+    priority_colors: Tuple[Tuple[str, str], ...]
+    status_colors: Tuple[Tuple[str, str], ...]
+    primary_color: str
+    secondary_color: str
+    task_categories: Tuple[str, ...]
+
+    @property
+    def priorities(self) -> List[str]:
+        """Priority names in display order (High, Medium, Low)."""
+        return [name for name, _ in self.priority_colors]
+
+    def priority_color(self, priority: str, default: str = "grey") -> str:
+        return dict(self.priority_colors).get(priority, default)
+
+    def status_scale(self) -> Tuple[List[str], List[str]]:
+        """(statuses, colors) for a chart color scale (Done, Todo)."""
+        return [name for name, _ in self.status_colors], [color for _, color in self.status_colors]
+
+    def validate(self) -> None:
+        """Raises ValueError describing every invalid setting."""
+        errors = []
+        for name in ("pomodoro_duration", "short_break_duration", "long_break_duration",
+                     "pomodoros_before_long_break", "target_daily_hours", "target_daily_minutes",
+                     "groq_max_concurrency"):
+            if getattr(self, name) <= 0:
+                errors.append(f"{name.upper()} must be positive")
+        if self.pomodoro_duration > self.target_daily_minutes:
+            errors.append("POMODORO_DURATION cannot exceed the daily target")
+        if not self.groq_model:
+            errors.append("GROQ_MODEL must not be empty")
+        if {name for name, _ in self.priority_colors} != {"High", "Medium", "Low"}:
+            errors.append("PRIORITY_COLORS must define exactly High, Medium and Low")
+        if {name for name, _ in self.status_colors} != {"Done", "Todo"}:
+            errors.append("STATUS_COLORS must define exactly Done and Todo")
+        if not self.primary_color or not self.secondary_color:
+            errors.append("PRIMARY_COLOR and SECONDARY_COLOR must not be empty")
+        if "Uncategorized" not in self.task_categories:
+            errors.append("TASK_CATEGORIES must include 'Uncategorized'")
+        if errors:
+            raise ValueError("Invalid settings: " + "; ".join(errors))
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Builds and validates the settings once per process."""
+    settings = Settings(
+        app_title=APP_TITLE,
+        app_icon=APP_ICON,
+        db_path=DB_PATH,
+        pomodoro_duration=POMODORO_DURATION,
+        short_break_duration=SHORT_BREAK_DURATION,
+        long_break_duration=LONG_BREAK_DURATION,
+        pomodoros_before_long_break=POMODOROS_BEFORE_LONG_BREAK,
+        target_daily_hours=TARGET_DAILY_HOURS,
+        target_daily_minutes=TARGET_DAILY_MINUTES,
+        groq_model=GROQ_MODEL,
+        groq_max_concurrency=GROQ_MAX_CONCURRENCY,
+        priority_colors=tuple(PRIORITY_COLORS.items()),
+        status_colors=tuple(STATUS_COLORS.items()),
+        primary_color=PRIMARY_COLOR,
+        secondary_color=SECONDARY_COLOR,
+        task_categories=tuple(TASK_CATEGORIES),
+    )
+    settings.validate()
+    return settings
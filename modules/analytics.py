@@ -0,0 +1,228 @@
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import SHARD_MAX_OPEN
+from modules.archive import TaskArchive
+from modules.database import ConnectionPool, DatabaseManager, get_connection_pool
+
+# Typed column dtypes for frames read straight from SQLite
+TASK_COUNT_DTYPES: Dict[str, str] = {"completed": "bool", "category": "string", "priority": "string", "count": "int64"}
+FOCUS_DAY_DTYPES: Dict[str, str] = {"minutes": "int64", "sessions": "int64"}
+FOCUS_SPLIT_DTYPES: Dict[str, str] = {"category": "string", "priority": "string", "minutes": "int64", "sessions": "int64"}
+
+
+@dataclass(frozen=True)
+class CompletionSummary:
+    completed: int
+    total: int
+
+    @property
+    def rate(self) -> float:
+        """Completion rate in percent."""
+        return self.completed / self.total * 100 if self.total else 0.0
+
+
+@dataclass(frozen=True)
+class FocusWindow:
+    """Focus totals for the days in [start, end)."""
+    start: date
+    end: date
+    minutes: int
+    sessions: int
+    active_days: int
+
+
+@dataclass(frozen=True)
+class StreakSummary:
+    """Consecutive days with at least one focus session."""
+    current: int
+    longest: int
+
+
+@dataclass(frozen=True)
+class ReviewReport:
+    """Everything the Review page renders, computed in a handful of queries."""
+    completion: CompletionSummary
+    total_focus_minutes: int
+    this_week: FocusWindow
+    last_week: FocusWindow
+    this_month: FocusWindow
+    streak: StreakSummary
+    daily_focus: pd.DataFrame          # date (datetime64), minutes, sessions; missing days filled with 0
+    focus_by_category: pd.DataFrame    # category, minutes, sessions (last 7 days)
+    focus_by_priority: pd.DataFrame    # priority, minutes, sessions (last 7 days)
+    tasks_by_status: pd.DataFrame      # status ("Done"/"Todo"), count
+    tasks_by_category: pd.DataFrame    # category, count
+    completion_by_priority: pd.DataFrame  # priority, completed, total, rate
+
+
+class ReviewAnalytics:
+    """
+    Vectorized Review-page analytics over the tasks table and the focus_daily_rollup table,
+    unioned with the Parquet archive (modules/archive.py) so archived history still counts.
+    Reports are memoized on the database's data versions, so unchanged data is not re-read.
+    """
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db: DatabaseManager = db
+        self.archive: TaskArchive = TaskArchive(db)
+        self._pool: ConnectionPool = get_connection_pool(db.db_path)
+        self._report_cache: Optional[Tuple[Hashable, ReviewReport]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _read(self, query: str, params: Sequence[Any] = (), dtype: Optional[Dict[str, str]] = None, parse_dates: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        with self._pool.connection() as conn:
+            return pd.read_sql(query, conn, params=list(params), dtype=dtype, parse_dates=parse_dates)
+
+    @staticmethod
+    def _union(hot: pd.DataFrame, archived: pd.DataFrame, keys: Sequence[str], values: Sequence[str]) -> pd.DataFrame:
+        """Adds archived aggregates to the hot ones, summing rows with the same keys."""
+        if archived.empty:
+            return hot
+        return (pd.concat([hot, archived[[*keys, *values]]], ignore_index=True)
+                .groupby(list(keys), as_index=False)[list(values)].sum())
+
+    # --- RAW FRAMES (one query each, plus the memoized archive aggregates) ---
+    def task_counts(self) -> pd.DataFrame:
+        """Task counts per (completed, category, priority)."""
+        hot: pd.DataFrame = self._read("""
+            SELECT completed != 0 AS completed,
+                   IFNULL(category, 'Uncategorized') AS category,
+                   IFNULL(priority, 'Medium') AS priority,
+                   COUNT(*) AS count
+            FROM tasks
+            GROUP BY 1, 2, 3
+        """, dtype=TASK_COUNT_DTYPES)
+        return self._union(hot, self.archive.frames()["task_counts"], ["completed", "category", "priority"], ["count"])
+
+    def daily_focus(self, since: Optional[date] = None) -> pd.DataFrame:
+        """Focus minutes and sessions per day (only days with sessions)."""
+        where: str = "WHERE day >= ?" if since else ""
+        hot: pd.DataFrame = self._read(f"""
+            SELECT day AS date, SUM(minutes) AS minutes, SUM(sessions) AS sessions
+            FROM focus_daily_rollup {where}
+            GROUP BY day
+            ORDER BY day
+        """, [since.isoformat()] if since else [], dtype=FOCUS_DAY_DTYPES, parse_dates=["date"])
+        archived: pd.DataFrame = self.archive.frames()["focus"]
+        if since:
+            archived = archived.loc[archived["date"] >= pd.Timestamp(since)]
+        return self._union(hot, archived, ["date"], ["minutes", "sessions"])
+
+    def focus_split(self, since: date) -> pd.DataFrame:
+        """Focus minutes per (category, task priority) since a day."""
+        hot: pd.DataFrame = self._read("""
+            SELECT r.category AS category, IFNULL(t.priority, 'No Task') AS priority,
+                   CASE WHEN t.id IS NULL AND r.task_id != '' THEN r.task_id END AS archived_task_id,
+                   SUM(r.minutes) AS minutes, SUM(r.sessions) AS sessions
+            FROM focus_daily_rollup r
+            LEFT JOIN tasks t ON t.id = r.task_id
+            WHERE r.day >= ?
+            GROUP BY 1, 2, 3
+        """, [since.isoformat()], dtype={**FOCUS_SPLIT_DTYPES, "archived_task_id": "string"})
+        archive: Dict[str, Any] = self.archive.frames()
+        # Recent sessions on tasks that were archived since keep the archived task's priority
+        hot["priority"] = (hot["archived_task_id"].map(archive["task_priority"]).fillna(hot["priority"])
+                           if not archive["task_priority"].empty else hot["priority"])
+        hot = hot.groupby(["category", "priority"], as_index=False)[["minutes", "sessions"]].sum()
+        archived: pd.DataFrame = archive["focus"]
+        return self._union(hot, archived.loc[archived["date"] >= pd.Timestamp(since)], ["category", "priority"], ["minutes", "sessions"])
+
+    # --- DERIVED METRICS (vectorized) ---
+    @staticmethod
+    def window(daily: pd.DataFrame, start: date, end: date) -> FocusWindow:
+        mask = (daily["date"] >= pd.Timestamp(start)) & (daily["date"] < pd.Timestamp(end))
+        selected: pd.DataFrame = daily.loc[mask]
+        return FocusWindow(
+            start=start,
+            end=end,
+            minutes=int(selected["minutes"].sum()),
+            sessions=int(selected["sessions"].sum()),
+            active_days=int((selected["minutes"] > 0).sum()),
+        )
+
+    @staticmethod
+    def streaks(daily: pd.DataFrame, today: date) -> StreakSummary:
+        """Current and longest runs of consecutive focus days, via run-length encoding of day ordinals."""
+        days: np.ndarray = daily.loc[daily["minutes"] > 0, "date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+        if days.size == 0:
+            return StreakSummary(current=0, longest=0)
+        run_ids: np.ndarray = np.concatenate(([0], np.cumsum(np.diff(days) != 1)))
+        run_lengths: np.ndarray = np.bincount(run_ids)
+        last_day: int = int(days[-1])
+        today_ordinal: int = int(np.datetime64(today, "D").astype(np.int64))
+        current: int = int(run_lengths[-1]) if today_ordinal - last_day <= 1 else 0  # Today may still be in progress
+        return StreakSummary(current=current, longest=int(run_lengths.max()))
+
+    @staticmethod
+    def fill_days(daily: pd.DataFrame, end: date) -> pd.DataFrame:
+        """Reindexes the daily frame over a continuous date range, filling gaps with zeros."""
+        if daily.empty:
+            return daily
+        full_range: pd.DatetimeIndex = pd.date_range(daily["date"].min(), max(daily["date"].max(), pd.Timestamp(end)), freq="D")
+        return (daily.set_index("date")
+                .reindex(full_range, fill_value=0)
+                .rename_axis("date")
+                .reset_index())
+
+    def report(self, today: Optional[date] = None) -> ReviewReport:
+        """Builds (or returns the memoized) Review report for a given day."""
+        today = today or date.today()
+        self.db.flush_writes() # The queries below read the pool directly, past the write queue's overlay
+        key: Hashable = (self.db.data_versions(("tasks", "focus", "archive")), today)
+        with self._lock:
+            if self._report_cache and self._report_cache[0] == key:
+                return self._report_cache[1]
+        report: ReviewReport = self._build_report(today)
+        with self._lock:
+            self._report_cache = (key, report)
+        return report
+
+    def _build_report(self, today: date) -> ReviewReport:
+        tomorrow: date = today + timedelta(days=1)
+        week_start: date = today - timedelta(days=6)
+
+        counts: pd.DataFrame = self.task_counts()
+        daily: pd.DataFrame = self.daily_focus()
+        split: pd.DataFrame = self.focus_split(week_start)
+
+        done: pd.Series = counts["count"].where(counts["completed"], 0)
+        completion = CompletionSummary(completed=int(done.sum()), total=int(counts["count"].sum()))
+
+        by_status: pd.DataFrame = (counts.assign(status=np.where(counts["completed"], "Done", "Todo"))
+                                   .groupby("status", as_index=False)["count"].sum())
+        by_category: pd.DataFrame = (counts.groupby("category", as_index=False)["count"].sum()
+                                     .sort_values("count", ascending=False, ignore_index=True))
+        by_priority: pd.DataFrame = (counts.assign(done=done)
+                                     .groupby("priority", as_index=False)
+                                     .agg(completed=("done", "sum"), total=("count", "sum")))
+        by_priority["rate"] = (by_priority["completed"] / by_priority["total"] * 100).round(1)
+
+        focus_by_category: pd.DataFrame = (split.groupby("category", as_index=False)[["minutes", "sessions"]].sum()
+                                           .sort_values("minutes", ascending=False, ignore_index=True))
+        focus_by_priority: pd.DataFrame = (split.groupby("priority", as_index=False)[["minutes", "sessions"]].sum()
+                                           .sort_values("minutes", ascending=False, ignore_index=True))
+
+        return ReviewReport(
+            completion=completion,
+            total_focus_minutes=int(daily["minutes"].sum()),
+            this_week=self.window(daily, week_start, tomorrow),
+            last_week=self.window(daily, week_start - timedelta(days=7), week_start),
+            this_month=self.window(daily, today - timedelta(days=29), tomorrow),
+            streak=self.streaks(daily, today),
+            daily_focus=self.fill_days(daily, today),
+            focus_by_category=focus_by_category,
+            focus_by_priority=focus_by_priority,
+            tasks_by_status=by_status,
+            tasks_by_category=by_category,
+            completion_by_priority=by_priority,
+        )
+
+
+@lru_cache(maxsize=SHARD_MAX_OPEN) # One per open database (shard)
+def get_review_analytics(db: DatabaseManager) -> ReviewAnalytics:
+    """Returns the process-wide analytics instance for a database, so memoized reports survive reruns."""
+    return ReviewAnalytics(db)
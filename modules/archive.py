@@ -0,0 +1,178 @@
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from config.settings import ARCHIVE_AFTER_DAYS
+from modules.database import DatabaseManager
+from modules.instrumentation import instrumented
+
+# Archived data sets: name -> (column -> pandas dtype). Each lives in <root>/<name>/month=YYYY-MM/*.parquet
+ARCHIVE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "tasks": {
+        "id": "string", "name": "string", "priority": "string", "duration": "Int64", "completed": "bool",
+        "created_at": "string", "category": "string", "notes": "string", "completed_at": "string",
+    },
+    "focus_sessions": {"id": "string", "task_id": "string", "start_time": "string", "duration_minutes": "Int64"},
+    # focus_daily_rollup rows, with the task priority captured at archive time (the task may be archived too)
+    "focus_daily": {"day": "string", "task_id": "string", "category": "string", "priority": "string", "minutes": "int64", "sessions": "int64"},
+}
+
+
+def _pyarrow() -> Any:
+    """Imports pyarrow on first use; it is only needed to write or read the archive."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The Parquet archive needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    """Rows moved out of SQLite by one TaskArchive.archive run."""
+    cutoff: date
+    tasks: int
+    sessions: int
+    rollup_rows: int
+    files: int
+
+
+class TaskArchive:
+    """
+    Month-partitioned Parquet archive of completed tasks, focus sessions and daily focus rollups
+    that are older than a cutoff. Archived rows are deleted from SQLite, so the hot tables (and
+    every get_tasks / focus query) only carry recent history. Each run writes new files, bumps
+    the "archive" data version and never rewrites existing files.
+    The default location is <database dir>/archive/<database name>/.
+    """
+    def __init__(self, db: DatabaseManager, root: Optional[Union[str, Path]] = None) -> None:
+        self.db: DatabaseManager = db
+        self.root: Path = Path(root) if root else db.db_path.parent / "archive" / db.db_path.stem
+        self._frames: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    # --- WRITE ---
+    @instrumented("db", "archive.archive")
+    def archive(self, older_than_days: int = ARCHIVE_AFTER_DAYS, today: Optional[date] = None) -> ArchiveResult:
+        """
+        Moves completed tasks (by completion time, or creation time for tasks completed before
+        completed_at existed) and focus sessions/rollups from days before the cutoff into Parquet.
+        Files are written first; if the SQLite delete then fails they are removed again.
+        """
+        cutoff: date = (today or date.today()) - timedelta(days=older_than_days)
+        cutoff_iso: str = cutoff.isoformat()
+        self.db.flush_writes()
+        written: List[Path] = []
+        with self.db.transaction(immediate=True) as conn:  # No writes may land between the reads and the deletes
+            frames: Dict[str, pd.DataFrame] = {
+                "tasks": pd.read_sql("""
+                    SELECT *, substr(COALESCE(completed_at, created_at), 1, 7) AS month FROM tasks
+                    WHERE completed != 0 AND COALESCE(completed_at, created_at) < ?
+                """, conn, params=[cutoff_iso]),
+                "focus_sessions": pd.read_sql(
+                    "SELECT *, substr(start_time, 1, 7) AS month FROM focus_sessions WHERE start_time < ?",
+                    conn, params=[cutoff_iso]),
+                "focus_daily": pd.read_sql("""
+                    SELECT r.day, r.task_id, r.category, IFNULL(t.priority, 'No Task') AS priority, r.minutes, r.sessions,
+                           substr(r.day, 1, 7) AS month
+                    FROM focus_daily_rollup r
+                    LEFT JOIN tasks t ON t.id = r.task_id
+                    WHERE r.day < ?
+                """, conn, params=[cutoff_iso]),
+            }
+            try:
+                for name, frame in frames.items():
+                    if not frame.empty:
+                        written += self._write(name, frame)
+                conn.execute("DELETE FROM tasks WHERE completed != 0 AND COALESCE(completed_at, created_at) < ?", (cutoff_iso,))
+                conn.execute("DELETE FROM focus_sessions WHERE start_time < ?", (cutoff_iso,))
+                conn.execute("DELETE FROM focus_daily_rollup WHERE day < ?", (cutoff_iso,))
+                if written:
+                    self.db.bump_versions(conn, "tasks", "focus", "archive")
+            except BaseException:
+                for path in written:
+                    path.unlink(missing_ok=True)
+                raise
+        return ArchiveResult(cutoff, len(frames["tasks"]), len(frames["focus_sessions"]), len(frames["focus_daily"]), len(written))
+
+    def _write(self, name: str, frame: pd.DataFrame) -> List[Path]:
+        """Appends one file per value of the frame's month column and returns their paths."""
+        pa = _pyarrow()
+        schema: Dict[str, str] = ARCHIVE_SCHEMAS[name]
+        months: pd.Series = frame["month"].fillna("unknown")
+        frame = frame.reindex(columns=list(schema))
+        if name == "tasks":
+            frame["completed"] = frame["completed"].astype(bool)
+            frame["notes"] = frame["notes"].fillna("")
+        frame = frame.astype(schema)
+        paths: List[Path] = []
+        batch_id: str = uuid.uuid4().hex
+        for month, part in frame.groupby(months, sort=True):
+            directory: Path = self.root / name / f"month={month}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path: Path = directory / f"part-{batch_id}.parquet"
+            pa.parquet.write_table(pa.Table.from_pandas(part, preserve_index=False), path)
+            paths.append(path)
+        return paths
+
+    # --- READ ---
+    def read(self, name: str, since: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads an archived data set as a typed frame (empty if nothing was archived yet).
+        since (YYYY-MM-DD) skips month partitions that end before it; rows are not filtered further.
+        """
+        schema: Dict[str, str] = ARCHIVE_SCHEMAS[name]
+        columns = columns or list(schema)
+        directory: Path = self.root / name
+        files: List[Path] = sorted(
+            path for path in directory.glob("month=*/*.parquet")
+            if since is None or path.parent.name[len("month="):] >= since[:7]
+        ) if directory.exists() else []
+        if not files:
+            return pd.DataFrame({column: pd.Series(dtype=schema[column]) for column in columns})
+        pq = _pyarrow().parquet
+        table = pq.ParquetDataset([str(path) for path in files]).read(columns=columns)
+        return table.to_pandas().astype({column: schema[column] for column in columns})
+
+    def frames(self) -> Dict[str, Any]:
+        """
+        Aggregates the analytics need from the archive, memoized on the "archive" data version:
+        task counts per (completed, category, priority), focus per (date, category, priority)
+        and the priority of every archived task (a Series indexed by task id).
+        """
+        (version,) = self.db.data_versions(("archive",))
+        with self._lock:
+            if self._frames and self._frames[0] == version:
+                return self._frames[1]
+        tasks: pd.DataFrame = (self.read("tasks", columns=["id", "completed", "category", "priority"])
+                               .fillna({"category": "Uncategorized", "priority": "Medium"}))
+        daily: pd.DataFrame = self.read("focus_daily", columns=["day", "category", "priority", "minutes", "sessions"])
+        frames: Dict[str, Any] = {
+            "task_counts": (tasks.groupby(["completed", "category", "priority"], as_index=False)
+                            .size().rename(columns={"size": "count"})),
+            "focus": (daily.assign(date=pd.to_datetime(daily["day"]))
+                      .groupby(["date", "category", "priority"], as_index=False)[["minutes", "sessions"]].sum()),
+            "task_priority": tasks.set_index("id")["priority"],
+        }
+        with self._lock:
+            self._frames = (version, frames)
+        return frames
+
+
+if __name__ == "__main__":
+    import argparse
+    from config.settings import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Move old completed tasks and focus sessions to the Parquet archive.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Archive history older than this many days")
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to the SQLite database")
+    parser.add_argument("--root", help="Archive directory (default: <db dir>/archive/<db name>)")
+    args = parser.parse_args()
+
+    result: ArchiveResult = TaskArchive(DatabaseManager(args.db), args.root).archive(args.days)
+    print(f"Archived before {result.cutoff}: {result.tasks} tasks, {result.sessions} sessions, "
+          f"{result.rollup_rows} rollup rows in {result.files} files")
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from config.settings import Settings, get_settings
+from modules.context_builder import ContextBuilder
+from modules.data_cache import CachedDatabaseManager
+from modules.execution import DaySchedule, ExecutionEngine, TaskScheduler
+from modules.habits import get_habit_store
+
+# Prompts of the morning briefing, in display order
+BRIEFING_PROMPTS: List[str] = ["daily_planning", "habit_tracking", "recommendations"]
+
+
+def recent_history(db: CachedDatabaseManager, scheduler: TaskScheduler, mood: str = "", today: Optional[date] = None, days: int = 7) -> str:
+    """Text for the recommendations prompt: today's mood, recent focus time and the open backlog."""
+    today = today or date.today()
+    stats: List[Dict[str, Any]] = db.get_focus_stats(since=(today - timedelta(days=days - 1)).isoformat())
+    per_day: str = ", ".join(f"{row['date']}: {row['minutes']}m" for row in reversed(stats)) or "no focus sessions"
+    return "\n".join([
+        f"Mood today: {mood.strip() or 'not given'}",
+        f"Focus time over the last {days} days: {sum(row['minutes'] or 0 for row in stats)}m ({per_day})",
+        f"Open tasks: {scheduler.incomplete_count} ({scheduler.remaining_capacity}m planned), "
+        f"completed: {db.count_tasks(completed=True)}",
+    ])
+
+
+def morning_briefing_requests(
+    db: CachedDatabaseManager,
+    mood: str = "",
+    settings: Optional[Settings] = None,
+    engine: Optional[ExecutionEngine] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Template arguments for every BRIEFING_PROMPTS key, ready for GroqClient.get_completions.
+    Everything is computed locally first, so the three requests can go out at once.
+    """
+    settings = settings or get_settings()
+    engine = engine or ExecutionEngine()
+    scheduler: TaskScheduler = db.get_scheduler()
+    schedule: DaySchedule = engine.plan_day(
+        scheduler,
+        day_minutes=settings.target_daily_minutes,
+        pomodoro=settings.pomodoro_duration,
+        short_break=settings.short_break_duration,
+        long_break=settings.long_break_duration,
+        long_break_every=settings.pomodoros_before_long_break,
+    )
+    return {
+        "daily_planning": ContextBuilder(engine).daily_planning(schedule, settings.target_daily_hours),
+        "habit_tracking": {"habit_data": get_habit_store(db).prompt_data()},
+        "recommendations": {"user_mood_and_history": recent_history(db, scheduler, mood)},
+    }
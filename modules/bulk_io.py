@@ -0,0 +1,254 @@
+import csv
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from config.settings import BULK_CHUNK_SIZE, get_settings
+from modules.database import DatabaseManager
+
+# Column order used for CSV exports (matches the tasks table)
+TASK_FIELDS: List[str] = ["id", "name", "priority", "duration", "completed", "created_at", "category", "notes", "completed_at"]
+
+FORMATS: Dict[str, str] = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+ProgressCallback = Callable[[int], None]
+
+
+def detect_format(path: Union[str, Path]) -> str:
+    """Infers json / jsonl / csv from the file extension."""
+    suffix: str = Path(path).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported file type '{suffix}'. Use one of: {', '.join(FORMATS)}")
+    return FORMATS[suffix]
+
+
+def _iter_json_array(file: Any, read_size: int = 1 << 16) -> Iterator[Any]:
+    """Yields the elements of a top-level JSON array one at a time, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    buffer: str = ""
+    pos: int = 0
+    eof: bool = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk: str = file.read(read_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        return bool(chunk)
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("Expected a JSON array of tasks")
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buffer) or buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof or not fill():
+                raise
+            continue
+        # A number at the end of the buffer may be truncated; make sure a delimiter follows
+        if end == len(buffer) and not eof and fill():
+            continue
+        pos = end
+        yield item
+
+
+def iter_records(path: Union[str, Path], fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streams raw task records from a JSON array, JSONL or CSV file.
+    The legacy {"tasks": [...], "habits": [...]} layout of productivity_data.json is also accepted.
+    """
+    fmt = fmt or detect_format(path)
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if fmt == "jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == "csv":
+            yield from csv.DictReader(file)
+        elif fmt == "json":
+            head: str = file.read(1)
+            while head and head.isspace():
+                head = file.read(1)
+            if head == "{":
+                # Legacy container object: small enough to load in one go
+                yield from json.loads(head + file.read()).get("tasks", [])
+            else:
+                file.seek(0)
+                yield from _iter_json_array(file)
+        else:
+            raise ValueError(f"Unknown format: {fmt}")
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "done")
+    return bool(value)
+
+
+def _parse_created_at(value: Any) -> str:
+    """Keeps valid ISO timestamps; replaces garbage (e.g. legacy os.times() reprs) with now."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).isoformat()
+        except ValueError:
+            pass
+    return datetime.now().isoformat()
+
+
+def _parse_completed_at(value: Any) -> Optional[str]:
+    """Keeps valid ISO timestamps as written; anything else is unknown (None), since now would be wrong."""
+    if isinstance(value, str) and value:
+        try:
+            datetime.fromisoformat(value)
+            return value
+        except ValueError:
+            pass
+    return None
+
+
+def normalize_task(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Maps a current or legacy (title/status) task record onto the tasks table.
+    Returns None for records without a name.
+    """
+    name: Any = record.get("name") or record.get("title")
+    if not name:
+        return None
+
+    task_id: Any = record.get("id")
+    # Legacy files use small integer ids that would collide across imports
+    if not isinstance(task_id, str) or not task_id or task_id.isdigit():
+        task_id = str(uuid.uuid4())
+
+    if "completed" in record and record["completed"] not in (None, ""):
+        completed: bool = _parse_bool(record["completed"])
+    else:
+        completed = str(record.get("status", "")).strip().lower() == "done"
+
+    try:
+        duration: int = int(record.get("duration") or 30)
+    except (TypeError, ValueError):
+        duration = 30
+
+    priority: Any = record.get("priority")
+    return {
+        "id": task_id,
+        "name": str(name),
+        "priority": priority if priority in get_settings().priorities else "Medium",
+        "duration": duration,
+        "completed": completed,
+        "created_at": _parse_created_at(record.get("created_at")),
+        "category": record.get("category") or "Uncategorized",
+        "notes": str(record.get("notes") or ""),
+        # Kept so re-imported tasks age in modules/archive.py from when they were done
+        "completed_at": _parse_completed_at(record.get("completed_at")) if completed else None,
+    }
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator: Iterator[Any] = iter(items)
+    while True:
+        chunk: List[Any] = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_tasks(
+    path: Union[str, Path],
+    db: Optional[DatabaseManager] = None,
+    fmt: Optional[str] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """
+    Streams tasks from a file into the database, one executemany transaction per chunk.
+    Rows with an existing id are replaced, so re-importing an export is idempotent.
+    Calls progress(total_so_far) after each chunk and returns the number of imported tasks.
+    """
+    db = db or DatabaseManager()
+    tasks: Iterator[Dict[str, Any]] = (t for t in map(normalize_task, iter_records(path, fmt)) if t)
+    total: int = 0
+    for chunk in _chunks(tasks, chunk_size):
+        total += db.add_tasks(chunk)
+        if progress:
+            progress(total)
+    return total
+
+
+def export_tasks(
+    path: Union[str, Path],
+    db: Optional[DatabaseManager] = None,
+    fmt: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    progress_every: int = BULK_CHUNK_SIZE,
+) -> int:
+    """Streams every task to a JSON array, JSONL or CSV file and returns the number written."""
+    db = db or DatabaseManager()
+    fmt = fmt or detect_format(path)
+    total: int = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer: Optional[csv.DictWriter] = None
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=TASK_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        elif fmt == "json":
+            file.write("[")
+        elif fmt != "jsonl":
+            raise ValueError(f"Unknown format: {fmt}")
+
+        for record in db.iter_tasks():
+            task: Dict[str, Any] = record.to_dict()
+            if writer:
+                writer.writerow(task)
+            elif fmt == "jsonl":
+                file.write(json.dumps(task, ensure_ascii=False) + "\n")
+            else:
+                file.write(("," if total else "") + "\n  " + json.dumps(task, ensure_ascii=False))
+            total += 1
+            if progress and total % progress_every == 0:
+                progress(total)
+
+        if fmt == "json":
+            file.write("\n]\n")
+    if progress:
+        progress(total)
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Bulk import/export of tasks (JSON, JSONL, CSV).")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="Source or destination file")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="Override format detection")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--db", help="Path to the SQLite database (defaults to DB_PATH)")
+    args = parser.parse_args()
+
+    manager: DatabaseManager = DatabaseManager(args.db) if args.db else DatabaseManager()
+    started: float = time.perf_counter()
+    report: ProgressCallback = lambda n: print(f"  ... {n} tasks", flush=True)
+    if args.command == "import":
+        count: int = import_tasks(args.path, manager, args.format, args.chunk_size, report)
+    else:
+        count = export_tasks(args.path, manager, args.format, report, args.chunk_size)
+    print(f"{args.command.capitalize()}ed {count} tasks in {time.perf_counter() - started:.2f}s")
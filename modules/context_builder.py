@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from config.settings import TARGET_DAILY_HOURS, PLANNING_CONTEXT_TOKEN_BUDGET, PLANNING_TASK_NAME_MAX_CHARS
+from modules.execution import DaySchedule, ExecutionEngine
+from modules.records import Task
+
+CHARS_PER_TOKEN: int = 4  # Conservative for Llama-family tokenizers on English text
+
+
+def count_tokens(text: str) -> int:
+    """Heuristic token count (UTF-8 bytes / CHARS_PER_TOKEN, rounded up); no tokenizer download needed."""
+    return -(-len(text.encode("utf-8")) // CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    """Budgeted task list for a prompt: `listed` tasks one per line, `summarized` folded into category lines."""
+    text: str
+    tokens: int
+    listed: int
+    summarized: int
+
+
+class ContextBuilder:
+    """
+    Builds prompt context that stays within a token budget however long the backlog is.
+    Tasks are ranked with ExecutionEngine.prioritize_tasks and listed until the budget is
+    reached; the low-priority tail is collapsed into one summary line per category.
+    """
+    def __init__(
+        self,
+        engine: Optional[ExecutionEngine] = None,
+        budget_tokens: int = PLANNING_CONTEXT_TOKEN_BUDGET,
+        max_name_chars: int = PLANNING_TASK_NAME_MAX_CHARS,
+    ) -> None:
+        self.engine: ExecutionEngine = engine or ExecutionEngine()
+        self.budget_tokens: int = budget_tokens
+        self.max_name_chars: int = max_name_chars
+
+    def task_line(self, task: Task) -> str:
+        name: str = " ".join((task.name or "").split())
+        if len(name) > self.max_name_chars:
+            name = name[:self.max_name_chars - 1] + "…"
+        return f"- {name} ({task.priority or 'Medium'}, {task.duration or 0}m, Category: {task.category or 'Uncategorized'})"
+
+    @staticmethod
+    def category_totals(tasks: List[Task], sign: int = 1, totals: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, int]]:
+        """Per category: task count, counts by priority and total minutes (subtracted when sign is -1)."""
+        totals = {} if totals is None else totals
+        for task in tasks:
+            group: Dict[str, int] = totals.setdefault(task.category or "Uncategorized", {"tasks": 0, "minutes": 0})
+            group["tasks"] += sign
+            group["minutes"] += sign * (task.duration or 0)
+            priority: str = task.priority or "Medium"
+            group[priority] = group.get(priority, 0) + sign
+        return totals
+
+    @staticmethod
+    def summary_lines(totals: Dict[str, Dict[str, int]]) -> List[str]:
+        lines: List[str] = []
+        for category, group in totals.items():
+            if group["tasks"] <= 0:
+                continue
+            priorities: str = ", ".join(f"{group[p]} {p}" for p in ("High", "Medium", "Low") if group.get(p))
+            lines.append(f"- +{group['tasks']} more {category} tasks ({priorities}), {group['minutes']}m total")
+        return lines
+
+    def build(self, tasks: List[Task], budget_tokens: Optional[int] = None, presorted: bool = False) -> TaskContext:
+        """
+        Lists incomplete tasks in priority order while they fit in the budget, leaving room for
+        the category summaries of whatever is left. Lines are only formatted up to the budget
+        and the tail is summarized from totals, so past the sort the cost is one pass (no sort
+        at all with presorted=True, for tasks already in prioritize_tasks order).
+        """
+        budget: int = self.budget_tokens if budget_tokens is None else budget_tokens
+        ranked: List[Task] = [t for t in (tasks if presorted else self.engine.prioritize_tasks(tasks)) if not t.completed]
+        if not ranked:
+            return TaskContext("None", 1, 0, 0)
+        totals: Dict[str, Dict[str, int]] = self.category_totals(ranked)
+        # Summaries of the whole list are the longest the tail's summaries can be
+        reserve: int = count_tokens("\n".join(self.summary_lines(totals))) + 1
+        lines: List[str] = []
+        used: int = 0
+        for task in ranked:
+            line: str = self.task_line(task)
+            cost: int = count_tokens(line) + 1  # + newline
+            tail_left: bool = len(lines) + 1 < len(ranked)
+            if used + cost + (reserve if tail_left else 0) > budget:
+                break
+            lines.append(line)
+            used += cost
+        listed: int = len(lines)
+        lines += self.summary_lines(self.category_totals(ranked[:listed], -1, totals))
+        text: str = "\n".join(lines)
+        return TaskContext(text, count_tokens(text), listed, len(ranked) - listed)
+
+    def daily_planning(self, schedule: DaySchedule, target_daily_hours: int = TARGET_DAILY_HOURS) -> Dict[str, Any]:
+        """
+        Prompt arguments for "daily_planning": the schedule (bounded by the workday) plus the
+        deferred tasks within whatever is left of the budget.
+        """
+        schedule_text: str = schedule.to_text() or "None"
+        # plan_day returns the deferred tasks in priority order
+        context: TaskContext = self.build(schedule.overflow, max(self.budget_tokens - count_tokens(schedule_text), 0), presorted=True)
+        return {"schedule": schedule_text, "user_context": context.text, "target_daily_hours": target_daily_hours}
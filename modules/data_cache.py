@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+from config.settings import DB_PATH, DATA_CACHE_MAX_ENTRIES
+from modules.database import DatabaseManager
+from modules.execution import TaskScheduler
+from modules.records import FocusSession, Task
+
+
+class CachedDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager whose read methods are memoized process-wide.
+    Each entry remembers the data versions it was computed from; every write bumps the
+    version of the data it touches ("tasks" or "focus"), so only the affected reads recompute.
+    Queued writes (see WriteQueue) also count as a change, so cached reads never miss them.
+    Cached rows and records are shared between sessions and must be treated as read-only.
+    """
+    def __init__(self, db_path: Union[str, Path] = DB_PATH, max_entries: int = DATA_CACHE_MAX_ENTRIES) -> None:
+        super().__init__(db_path)
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._scheduler: Optional[TaskScheduler] = None
+        self._scheduler_version: int = -1
+        self._write_lock: threading.RLock = threading.RLock()
+
+    def _cached(self, tables: Tuple[str, ...], key: Hashable, compute: Callable[[], Any]) -> Any:
+        versions: Tuple[int, ...] = (*self.data_versions(tables), self._writes.generation)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                return entry[1]
+        result: Any = compute()
+        with self._lock:
+            self._entries[key] = (versions, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _key(method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+        return (method, args, tuple(sorted(kwargs.items())))
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        with self._write_lock:
+            self._scheduler = None
+
+    # --- INCREMENTAL SCHEDULER ---
+    def get_scheduler(self) -> TaskScheduler:
+        """
+        Returns the shared TaskScheduler over all tasks. Local writes are applied to it
+        incrementally; it is only rebuilt when the tasks version moved for another reason
+        (e.g. a write from another process or a bulk import).
+        """
+        with self._write_lock:
+            (version,) = self.data_versions(("tasks",))
+            if self._scheduler is None or version != self._scheduler_version:
+                self._scheduler = TaskScheduler(DatabaseManager.get_tasks(self)) # Table (rowid) order keeps ties stable
+                self._scheduler_version = version
+            return self._scheduler
+
+    def _apply_write(self, write: Callable[[], Any], delta: Callable[[TaskScheduler, Any], None]) -> Any:
+        """Runs a task write and mirrors it into the scheduler if no other write interleaved."""
+        with self._write_lock:
+            before: int = self._scheduler_version
+            result: Any = write()
+            if self._scheduler is not None:
+                (after,) = self.data_versions(("tasks",))
+                if after == before + 1:
+                    delta(self._scheduler, result)
+                    self._scheduler_version = after
+                else:
+                    self._scheduler = None
+            return result
+
+    def add_task(self, *args: Any, **kwargs: Any) -> str:
+        return self._apply_write(
+            lambda: DatabaseManager.add_task(self, *args, **kwargs),
+            lambda scheduler, task_id: scheduler.add(DatabaseManager.get_task(self, task_id)),
+        )
+
+    def update_task_status(self, task_id: str, completed: bool) -> None:
+        self._apply_write(
+            lambda: DatabaseManager.update_task_status(self, task_id, completed),
+            lambda scheduler, _: scheduler.complete(task_id, bool(completed)),
+        )
+
+    def delete_task(self, task_id: str) -> None:
+        self._apply_write(
+            lambda: DatabaseManager.delete_task(self, task_id),
+            lambda scheduler, _: scheduler.remove(task_id),
+        )
+
+    def update_task_details(self, task_id: str, name: str, priority: str, duration: int, category: str, notes: Optional[str] = None) -> None:
+        changes: Dict[str, Any] = self._detail_changes(name, priority, duration, category, notes)
+        self._apply_write(
+            lambda: DatabaseManager.update_task_details(self, task_id, name, priority, duration, category, notes),
+            lambda scheduler, _: scheduler.update(task_id, **changes),
+        )
+
+    @staticmethod
+    def _detail_changes(name: str, priority: str, duration: int, category: str, notes: Optional[str]) -> Dict[str, Any]:
+        changes: Dict[str, Any] = {"name": name, "priority": priority, "duration": duration, "category": category}
+        if notes is not None:
+            changes["notes"] = notes
+        return changes
+
+    def queue_task_status(self, task_id: str, completed: bool) -> None:
+        with self._write_lock:
+            DatabaseManager.queue_task_status(self, task_id, completed)
+            if self._scheduler is not None:
+                self._scheduler.complete(task_id, bool(completed))
+
+    def queue_task_details(self, task_id: str, name: str, priority: str, duration: int, category: str, notes: Optional[str] = None) -> None:
+        with self._write_lock:
+            DatabaseManager.queue_task_details(self, task_id, name, priority, duration, category, notes)
+            if self._scheduler is not None:
+                self._scheduler.update(task_id, **self._detail_changes(name, priority, duration, category, notes))
+
+    def flush_writes(self) -> Tuple[int, int]:
+        # Queued task writes are already in the scheduler, so a flush only advances its version
+        with self._write_lock:
+            before: int = self._scheduler_version
+            tasks_updated, sessions_logged = DatabaseManager.flush_writes(self)
+            if tasks_updated and self._scheduler is not None:
+                (after,) = self.data_versions(("tasks",))
+                if after == before + 1:
+                    self._scheduler_version = after
+                else:
+                    self._scheduler = None
+            return tasks_updated, sessions_logged
+
+    def get_tasks(self, *args: Any, **kwargs: Any) -> List[Task]:
+        return list(self._cached(("tasks",), self._key("get_tasks", args, kwargs),
+                                 lambda: DatabaseManager.get_tasks(self, *args, **kwargs)))
+
+    def count_tasks(self, *args: Any, **kwargs: Any) -> int:
+        return self._cached(("tasks",), self._key("count_tasks", args, kwargs),
+                            lambda: DatabaseManager.count_tasks(self, *args, **kwargs))
+
+    def search_tasks(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 50) -> List[Task]:
+        key: Hashable = ("search_tasks", query, tuple(sorted((filters or {}).items())), limit)
+        return list(self._cached(("tasks",), key, lambda: DatabaseManager.search_tasks(self, query, filters, limit)))
+
+    def get_focus_stats(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return list(self._cached(("focus",), self._key("get_focus_stats", args, kwargs),
+                                 lambda: DatabaseManager.get_focus_stats(self, *args, **kwargs)))
+
+    def get_focus_sessions(self, *args: Any, **kwargs: Any) -> List[FocusSession]:
+        return list(self._cached(("focus",), self._key("get_focus_sessions", args, kwargs),
+                                 lambda: DatabaseManager.get_focus_sessions(self, *args, **kwargs)))
+
+    def get_focus_breakdown(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        # Per-task breakdowns join task names, so task edits invalidate them too
+        return list(self._cached(("focus", "tasks"), self._key("get_focus_breakdown", args, kwargs),
+                                 lambda: DatabaseManager.get_focus_breakdown(self, *args, **kwargs)))
+
+
+@lru_cache(maxsize=None)
+def get_database(db_path: Union[str, Path] = DB_PATH) -> CachedDatabaseManager:
+    """Returns the process-wide cached DatabaseManager shared by all pages and sessions."""
+    return CachedDatabaseManager(db_path)
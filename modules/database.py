@@ -1,22 +1,293 @@
+import atexit
+import queue
+import re
 import sqlite3
+import threading
 import uuid
+import weakref
+from contextlib import contextmanager
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from config.settings import DB_PATH # Use the centralized DB_PATH
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Union, ContextManager, Tuple, Callable
+from config.settings import DB_PATH, DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE, DB_CACHE_SIZE_KB, WRITE_QUEUE_FLUSH_SECONDS # Use the centralized DB_PATH
+from modules.instrumentation import instrumented
+from modules.records import Task, FocusSession, TASK_COLUMNS, FOCUS_SESSION_COLUMNS, task_factory, focus_session_factory
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived SQLite connections for a single database file.
+    Connections are opened lazily in WAL mode and reused across reruns and sessions.
+    """
+    def __init__(self, db_path: Union[str, Path], max_size: int = DB_POOL_SIZE) -> None:
+        self.db_path: Path = Path(db_path)
+        self.schema_ready: bool = False
+        self.search_ready: bool = False  # Whether tasks_fts exists (SQLite built with FTS5)
+        self.init_lock: threading.Lock = threading.Lock()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max_size)
+        self._closed: bool = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a new connection and applies the tuned pragmas."""
+        conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+        conn.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size=-{int(DB_CACHE_SIZE_KB)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA recursive_triggers=ON")  # INSERT OR REPLACE must fire the tasks_fts delete trigger
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Returns an idle connection, opening a new one if none is available."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Returns a connection to the pool, closing it if the pool is full or closed."""
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection for one transaction (commit on success, rollback on error)."""
+        conn = self.acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Closes all idle connections; borrowed ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# Task columns that may be written through the write queue
+QUEUED_TASK_COLUMNS: Tuple[str, ...] = ("completed", "name", "priority", "duration", "category", "notes")
+
+_WRITE_QUEUES: "weakref.WeakSet[WriteQueue]" = weakref.WeakSet()
+
+
+class WriteQueue:
+    """
+    Write-behind buffer for one DatabaseManager. Task updates are coalesced per task and
+    column (the last value wins); focus sessions are appended. A background timer calls
+    `flush` shortly after the first enqueue, and every queue that was used is flushed at
+    interpreter exit.
+    Writes being committed stay visible through `overlay` until the commit finishes.
+    """
+    def __init__(self, flush: Callable[[], Any], interval: float = WRITE_QUEUE_FLUSH_SECONDS) -> None:
+        self.flush: Callable[[], Any] = flush
+        self.interval: float = interval
+        self.flush_lock: threading.RLock = threading.RLock()
+        self.generation: int = 0  # Bumped by every enqueue, part of cache keys in modules/data_cache.py
+        self._lock: threading.Lock = threading.Lock()
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self._sessions: List[Tuple[Optional[str], int, str]] = []
+        self._inflight_updates: Dict[str, Dict[str, Any]] = {}
+        self._inflight_sessions: List[Tuple[Optional[str], int, str]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def add_task_update(self, task_id: str, values: Dict[str, Any]) -> None:
+        unknown = set(values) - set(QUEUED_TASK_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot queue writes to task columns: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._updates.setdefault(task_id, {}).update(values)
+            self.generation += 1
+            self._schedule()
+
+    def add_focus_session(self, task_id: Optional[str], duration_minutes: int, start_time: str) -> None:
+        with self._lock:
+            self._sessions.append((task_id, duration_minutes, start_time))
+            self.generation += 1
+            self._schedule()
+
+    def discard(self, task_id: str, columns: Optional[Iterable[str]] = None) -> None:
+        """Drops pending values superseded by a synchronous write (all columns if None)."""
+        with self._lock:
+            pending = self._updates.get(task_id)
+            if pending is None:
+                return
+            for column in (QUEUED_TASK_COLUMNS if columns is None else columns):
+                pending.pop(column, None)
+            if not pending:
+                del self._updates[task_id]
+            self.generation += 1
+
+    def overlay(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the uncommitted column values per task id (in-flight and pending)."""
+        with self._lock:
+            if not self._updates and not self._inflight_updates:
+                return {}
+            merged: Dict[str, Dict[str, Any]] = {task_id: dict(values) for task_id, values in self._inflight_updates.items()}
+            for task_id, values in self._updates.items():
+                merged.setdefault(task_id, {}).update(values)
+            return merged
+
+    def has_sessions(self) -> bool:
+        with self._lock:
+            return bool(self._sessions or self._inflight_sessions)
+
+    def take(self) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[Optional[str], int, str]]]:
+        """Moves the pending writes in flight; call with flush_lock held, then `done` or `restore`."""
+        with self._lock:
+            self._inflight_updates, self._updates = self._updates, {}
+            self._inflight_sessions, self._sessions = self._sessions, []
+            return self._inflight_updates, self._inflight_sessions
+
+    def done(self) -> None:
+        """Forgets the in-flight writes after they were committed."""
+        with self._lock:
+            self._inflight_updates, self._inflight_sessions = {}, []
+
+    def restore(self) -> None:
+        """Puts in-flight writes back after a failed commit, keeping any newer pending values."""
+        with self._lock:
+            for task_id, values in self._inflight_updates.items():
+                self._updates[task_id] = {**values, **self._updates.get(task_id, {})}
+            self._sessions[:0] = self._inflight_sessions
+            self._inflight_updates, self._inflight_sessions = {}, []
+            self._schedule()
+
+    def _schedule(self) -> None:
+        # Caller holds self._lock. Registered for the exit flush only once something is queued,
+        # so a manager whose __init__ failed half-way is never flushed.
+        _WRITE_QUEUES.add(self)
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()  # On failure the writes are restored and rescheduled; the error reaches threading.excepthook
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+@atexit.register
+def _flush_write_queues() -> None:
+    """Durable fallback: commits whatever is still queued when the process shuts down."""
+    for write_queue in list(_WRITE_QUEUES):
+        write_queue.cancel()
+        write_queue.flush()
+
+
+# SQL mirrors of ExecutionEngine.prioritize_tasks (High > Medium > Low, missing duration counts as 60m).
+# Queries must use these exact expressions for SQLite to pick idx_tasks_schedule.
+PRIORITY_RANK_SQL = "CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END"
+EFFECTIVE_DURATION_SQL = "IFNULL(NULLIF(duration, 0), 60)"
+
+# Select lists matching the record constructors (see modules/records.py)
+TASK_SELECT = ", ".join(TASK_COLUMNS)
+FOCUS_SESSION_SELECT = ", ".join(FOCUS_SESSION_COLUMNS)
+
+# Sort orders accepted by DatabaseManager.get_tasks
+TASK_SORT_ORDERS: Dict[str, str] = {
+    "priority": f"completed, {PRIORITY_RANK_SQL}, {EFFECTIVE_DURATION_SQL}",
+    "newest": "created_at DESC",
+    "oldest": "created_at ASC",
+    "name": "name COLLATE NOCASE",
+}
+
+_POOLS: Dict[Path, ConnectionPool] = {}
+_POOLS_LOCK: threading.Lock = threading.Lock()
+
+
+def get_connection_pool(db_path: Union[str, Path] = DB_PATH) -> ConnectionPool:
+    """Returns the process-wide connection pool for a database file."""
+    key = Path(db_path).resolve()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(key)
+        return pool
+
+
+def close_connection_pool(db_path: Union[str, Path], pool: Optional[ConnectionPool] = None) -> None:
+    """
+    Forgets and closes the pool for a database file; a later get_connection_pool opens a new one.
+    When pool is given, does nothing unless that pool is still the registered one.
+    """
+    key = Path(db_path).resolve()
+    with _POOLS_LOCK:
+        if pool is not None and _POOLS.get(key) is not pool:
+            return
+        pool = _POOLS.pop(key, None)
+    if pool is not None:
+        pool.close()
+
 
 class DatabaseManager:
-    def __init__(self) -> None:
-        self._init_db()
+    def __init__(self, db_path: Union[str, Path] = DB_PATH) -> None:
+        self.db_path: Path = Path(db_path)
+        self._pool: ConnectionPool = get_connection_pool(self.db_path)
+        self._writes: WriteQueue = WriteQueue(self.flush_writes)
+        if not self._pool.schema_ready:
+            with self._pool.init_lock:
+                if not self._pool.schema_ready:
+                    self._init_db()
+                    self._pool.schema_ready = True
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Establishes and returns a database connection."""
-        return sqlite3.connect(DB_PATH, check_same_thread=False)
+    def _get_connection(self) -> ContextManager[sqlite3.Connection]:
+        """Borrows a pooled connection wrapped in a transaction."""
+        return self._pool.connection()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a pooled connection for one transaction (commit on success, rollback on error),
+        for modules that keep their own tables in this database. With immediate, the write lock
+        is taken up front (BEGIN IMMEDIATE), so nothing can land between the transaction's
+        reads and its writes.
+        """
+        with self._get_connection() as conn:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    @staticmethod
+    def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+        """Adds a column to an existing table if it is missing (for existing databases)."""
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
     def _init_db(self) -> None:
-        """Initializes the database schema if tables do not exist and adds new columns if needed."""
+        """Initializes the database schema once per process and adds new columns if needed."""
         with self._get_connection() as conn:
             cursor: sqlite3.Cursor = conn.cursor()
-            
+
+            # Version counters bumped by every write, used to invalidate cached reads
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """)
+
             # Tasks Table
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS tasks (
@@ -26,16 +297,28 @@ class DatabaseManager:
                 duration INTEGER DEFAULT 30,
                 completed BOOLEAN DEFAULT 0,
                 created_at TEXT,
-                category TEXT DEFAULT 'Uncategorized'
+                category TEXT DEFAULT 'Uncategorized',
+                notes TEXT DEFAULT '',
+                completed_at TEXT
             )
             """)
             
             # Add category column if it doesn't exist (for existing databases)
-            try:
-                cursor.execute("ALTER TABLE tasks ADD COLUMN category TEXT DEFAULT 'Uncategorized'")
-            except sqlite3.OperationalError as e:
-                if "duplicate column name: category" not in str(e):
-                    raise # Re-raise if it's not the "duplicate column" error
+            self._ensure_column(cursor, "tasks", "category", "TEXT DEFAULT 'Uncategorized'")
+            self._ensure_column(cursor, "tasks", "notes", "TEXT DEFAULT ''")
+            self._ensure_column(cursor, "tasks", "completed_at", "TEXT")
+
+            # Completion time for every write path (sync, queued, bulk edit); used by modules/archive.py
+            cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_at AFTER UPDATE OF completed ON tasks
+            WHEN new.completed IS NOT old.completed BEGIN
+                UPDATE tasks SET completed_at = CASE WHEN new.completed THEN strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime') END
+                WHERE rowid = new.rowid;
+            END
+            """)
+
+            # Full-text index over task names and notes (external content: rows live in tasks)
+            self._pool.search_ready = self._init_search(cursor)
             
             # Focus Sessions Table
             cursor.execute("""
@@ -47,64 +330,589 @@ class DatabaseManager:
                 FOREIGN KEY(task_id) REFERENCES tasks(id)
             )
             """)
-            conn.commit()
+
+            # Daily focus rollup, maintained by log_focus_session (task_id '' = no task)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS focus_daily_rollup (
+                day TEXT NOT NULL,
+                task_id TEXT NOT NULL DEFAULT '',
+                category TEXT NOT NULL DEFAULT 'Uncategorized',
+                minutes INTEGER NOT NULL DEFAULT 0,
+                sessions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, task_id, category)
+            ) WITHOUT ROWID
+            """)
+
+            # Persisted focus timers (see modules/timer.py); times are epoch seconds
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS active_timers (
+                id TEXT PRIMARY KEY,
+                task_id TEXT,
+                mode TEXT NOT NULL DEFAULT 'Focus',
+                state TEXT NOT NULL,
+                duration_seconds INTEGER NOT NULL,
+                elapsed_seconds REAL NOT NULL DEFAULT 0,
+                resumed_at REAL,
+                started_at REAL NOT NULL,
+                logged BOOLEAN NOT NULL DEFAULT 0,
+                updated_at REAL
+            )
+            """)
+
+            # Habits and their daily check-ins, one bit per day packed into a BLOB per year (see modules/habits.py)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS habits (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                created_at TEXT
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS habit_checkins (
+                habit_id TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                PRIMARY KEY (habit_id, year)
+            ) WITHOUT ROWID
+            """)
+
+            # Indexes (the schedule index matches TASK_SORT_ORDERS["priority"])
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_schedule ON tasks(completed, {PRIORITY_RANK_SQL}, {EFFECTIVE_DURATION_SQL})")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category, completed)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_focus_sessions_start_time ON focus_sessions(start_time)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_focus_sessions_task_id ON focus_sessions(task_id)")
+
+            # Backfill once when upgrading a database that already has sessions (every table exists by now)
+            rollup_empty: bool = cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM focus_daily_rollup)").fetchone()[0]
+            has_sessions: bool = cursor.execute("SELECT EXISTS (SELECT 1 FROM focus_sessions)").fetchone()[0]
+            if rollup_empty and has_sessions:
+                self._rebuild_focus_rollup(conn)
+
+    @staticmethod
+    def _init_search(cursor: sqlite3.Cursor) -> bool:
+        """Creates tasks_fts and its sync triggers, backfilling it on first creation. False without FTS5."""
+        exists: bool = cursor.execute("SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts')").fetchone()[0]
+        try:
+            cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                name, notes, content='tasks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+            )
+            """)
+        except sqlite3.OperationalError:
+            return False  # search_tasks falls back to LIKE
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, name, notes) VALUES (new.rowid, new.name, new.notes);
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, notes) VALUES ('delete', old.rowid, old.name, old.notes);
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, notes ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, notes) VALUES ('delete', old.rowid, old.name, old.notes);
+            INSERT INTO tasks_fts (rowid, name, notes) VALUES (new.rowid, new.name, new.notes);
+        END
+        """)
+        if not exists:
+            cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+        return True
+
+    # --- DATA VERSIONS ---
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection, name: str) -> None:
+        """Increments a data version inside the caller's write transaction (see modules/data_cache.py)."""
+        conn.execute(
+            "INSERT INTO data_versions (name, version) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,)
+        )
+
+    def bump_versions(self, conn: sqlite3.Connection, *names: str) -> None:
+        """Marks data sets as changed by a write made through transaction() (in that same transaction)."""
+        for name in names:
+            self._bump_version(conn, name)
+
+    @instrumented("db")
+    def data_versions(self, names: Iterable[str]) -> Tuple[int, ...]:
+        """Returns the current version of each named data set ("tasks", "focus"), 0 if never written."""
+        names = list(names)
+        with self._get_connection() as conn:
+            rows: Dict[str, int] = dict(conn.execute(
+                f"SELECT name, version FROM data_versions WHERE name IN ({', '.join('?' * len(names))})", names
+            ).fetchall())
+        return tuple(rows.get(name, 0) for name in names)
 
     # --- TASKS ---
-    def add_task(self, name: str, priority: str = "Medium", duration: int = 30, category: str = "Uncategorized") -> str:
+    @instrumented("db")
+    def add_task(self, name: str, priority: str = "Medium", duration: int = 30, category: str = "Uncategorized", notes: str = "") -> str:
         """Adds a new task to the database."""
         task_id: str = str(uuid.uuid4())
         created_at: str = datetime.now().isoformat()
         with self._get_connection() as conn:
             conn.execute(
-                "INSERT INTO tasks (id, name, priority, duration, completed, created_at, category) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (task_id, name, priority, duration, False, created_at, category)
+                "INSERT INTO tasks (id, name, priority, duration, completed, created_at, category, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, name, priority, duration, False, created_at, category, notes)
             )
+            self._bump_version(conn, "tasks")
         return task_id
 
-    def get_tasks(self) -> List[Dict[str, Any]]:
-        """Retrieves all tasks from the database."""
+    @staticmethod
+    def _task_filters(
+        completed: Optional[bool] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> Tuple[str, List[Any]]:
+        """Builds the WHERE clause and parameters shared by get_tasks and count_tasks."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(completed))
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if priority is not None:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
+        where: str = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    @instrumented("db")
+    def get_tasks(
+        self,
+        completed: Optional[bool] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Task]:
+        """
+        Retrieves tasks matching the given filters.
+        created_after/created_before are ISO timestamps (inclusive/exclusive).
+        order_by is a key of TASK_SORT_ORDERS; limit/offset paginate the result.
+        """
+        pending: Dict[str, Dict[str, Any]] = self._writes.overlay()
+        if pending and (completed is not None or category is not None or priority is not None or order_by in ("priority", "name")):
+            # Filters and sorts on queued columns must see the writes, so commit them first
+            self.flush_writes()
+            pending = {}
+        where, params = self._task_filters(completed, category, priority, created_after, created_before)
+        query: str = f"SELECT {TASK_SELECT} FROM tasks{where}"
+        if order_by is not None:
+            if order_by not in TASK_SORT_ORDERS:
+                raise ValueError(f"Unknown task sort order: {order_by}")
+            query += f" ORDER BY {TASK_SORT_ORDERS[order_by]}"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor: sqlite3.Cursor = conn.execute("SELECT * FROM tasks")
-            return [dict(row) for row in cursor.fetchall()]
+            return self._overlay_rows(self._select_tasks(conn, query, params).fetchall(), pending)
+
+    @staticmethod
+    def _select_tasks(conn: sqlite3.Connection, query: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        """Runs a SELECT of TASK_SELECT columns on a cursor that yields Task records."""
+        cursor: sqlite3.Cursor = conn.cursor()
+        cursor.row_factory = task_factory
+        return cursor.execute(query, list(params))
+
+    @staticmethod
+    def _overlay_rows(rows: List[Task], pending: Dict[str, Dict[str, Any]]) -> List[Task]:
+        """Applies queued (uncommitted) task values to rows so a session reads its own writes."""
+        if pending:
+            for index, row in enumerate(rows):
+                values = pending.get(row.id)
+                if values:
+                    rows[index] = replace(row, **values)
+        return rows
+
+    @instrumented("db")
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """Retrieves a single task by id."""
+        pending: Dict[str, Dict[str, Any]] = self._writes.overlay()
+        with self._get_connection() as conn:
+            row: Optional[Task] = self._select_tasks(conn, f"SELECT {TASK_SELECT} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            return self._overlay_rows([row], pending)[0] if row else None
+
+    @instrumented("db")
+    def count_tasks(
+        self,
+        completed: Optional[bool] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> int:
+        """Counts tasks matching the same filters as get_tasks."""
+        if (completed is not None or category is not None or priority is not None) and self._writes.overlay():
+            self.flush_writes()
+        where, params = self._task_filters(completed, category, priority, created_after, created_before)
+        with self._get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM tasks{where}", params).fetchone()[0]
+
+    @instrumented("db")
+    def search_tasks(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 50) -> List[Task]:
+        """
+        Full-text search over task names and notes, best matches first (name hits weigh more).
+        Every word is matched as a prefix, so "deep wor" finds "Deep Work". filters takes the
+        get_tasks filter keywords (completed, category, priority, created_after, created_before).
+        """
+        terms: List[str] = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        if self._writes.overlay():
+            self.flush_writes()  # Queued renames must be searchable
+        where, params = self._task_filters(**(filters or {}))
+        if self._pool.search_ready:
+            match: str = " ".join(f'"{term}"*' for term in terms)
+            sql: str = f"""
+                SELECT {", ".join(f"t.{column}" for column in TASK_COLUMNS)} FROM tasks t
+                JOIN (SELECT rowid, bm25(tasks_fts, 10.0, 1.0) AS rank FROM tasks_fts WHERE tasks_fts MATCH ?) f
+                    ON f.rowid = t.rowid{where}
+                ORDER BY f.rank
+                LIMIT ?
+            """
+            params = [match, *params, limit]
+        else:
+            # Without FTS5: substring scan, name matches first
+            likes: List[str] = [f"%{term}%" for term in terms]
+            term_clauses: str = " AND ".join("(name LIKE ? OR notes LIKE ?)" for _ in terms)
+            where = f"{where} AND {term_clauses}" if where else f" WHERE {term_clauses}"
+            sql = f"""
+                SELECT {TASK_SELECT} FROM tasks{where}
+                ORDER BY name LIKE ? DESC, created_at DESC
+                LIMIT ?
+            """
+            params = [*params, *(like for like in likes for _ in range(2)), likes[0], limit]
+        with self._get_connection() as conn:
+            return self._select_tasks(conn, sql, params).fetchall()
+
+    @instrumented("db")
+    def rebuild_search_index(self) -> None:
+        """Rebuilds tasks_fts from the tasks table (e.g. after a VACUUM renumbered rowids)."""
+        if not self._pool.search_ready:
+            return
+        with self._get_connection() as conn:
+            conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
             
+    @instrumented("db")
+    def add_tasks(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserts (or replaces, by id) many fully-populated task rows in a single transaction.
+        Each row needs id, name, priority, duration, completed, created_at and category (notes and
+        completed_at are optional; the completion trigger only fires on UPDATE, so pass completed_at).
+        """
+        rows: List[Tuple[Any, ...]] = [
+            (t["id"], t["name"], t["priority"], t["duration"], t["completed"], t["created_at"], t["category"],
+             t.get("notes") or "", t.get("completed_at"))
+            for t in tasks
+        ]
+        for row in rows:
+            self._writes.discard(row[0])
+        with self._get_connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, name, priority, duration, completed, created_at, category, notes, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._bump_version(conn, "tasks")
+        return len(rows)
+
+    def iter_tasks(self, batch_size: int = 1000) -> Iterator[Task]:
+        """Streams every task in creation order without materializing the whole table."""
+        pending: Dict[str, Dict[str, Any]] = self._writes.overlay()
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = self._select_tasks(conn, f"SELECT {TASK_SELECT} FROM tasks ORDER BY created_at")
+            while True:
+                batch: List[Task] = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from self._overlay_rows(batch, pending)
+
+    @instrumented("db")
     def update_task_status(self, task_id: str, completed: bool) -> None:
         """Updates the completion status of a task."""
+        self._writes.discard(task_id, ("completed",))
         with self._get_connection() as conn:
             conn.execute("UPDATE tasks SET completed = ? WHERE id = ?", (completed, task_id))
+            self._bump_version(conn, "tasks")
             
+    @instrumented("db")
     def delete_task(self, task_id: str) -> None:
         """Deletes a task from the database."""
+        self._writes.discard(task_id)
         with self._get_connection() as conn:
             conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self._bump_version(conn, "tasks")
 
-    def update_task_details(self, task_id: str, name: str, priority: str, duration: int, category: str) -> None:
-        """Updates the details of an existing task."""
+    @instrumented("db")
+    def update_task_details(self, task_id: str, name: str, priority: str, duration: int, category: str, notes: Optional[str] = None) -> None:
+        """Updates the details of an existing task (notes are left unchanged if None)."""
+        self._writes.discard(task_id, ("name", "priority", "duration", "category") + (("notes",) if notes is not None else ()))
         with self._get_connection() as conn:
             conn.execute(
-                "UPDATE tasks SET name = ?, priority = ?, duration = ?, category = ? WHERE id = ?", 
-                (name, priority, duration, category, task_id)
+                "UPDATE tasks SET name = ?, priority = ?, duration = ?, category = ?, notes = COALESCE(?, notes) WHERE id = ?", 
+                (name, priority, duration, category, notes, task_id)
             )
+            self._bump_version(conn, "tasks")
+
+    # --- WRITE QUEUE ---
+    @instrumented("db")
+    def queue_task_status(self, task_id: str, completed: bool) -> None:
+        """Like update_task_status, but committed by the write queue shortly after (see WriteQueue)."""
+        self._writes.add_task_update(task_id, {"completed": int(bool(completed))})
+
+    @instrumented("db")
+    def queue_task_details(self, task_id: str, name: str, priority: str, duration: int, category: str, notes: Optional[str] = None) -> None:
+        """Like update_task_details, but committed by the write queue shortly after."""
+        values: Dict[str, Any] = {"name": name, "priority": priority, "duration": duration, "category": category}
+        if notes is not None:
+            values["notes"] = notes
+        self._writes.add_task_update(task_id, values)
+
+    @instrumented("db")
+    def queue_focus_session(self, task_id: Optional[str], duration_minutes: int) -> None:
+        """Like log_focus_session, but committed by the write queue shortly after."""
+        self._writes.add_focus_session(task_id, duration_minutes, datetime.now().isoformat())
+
+    @instrumented("db")
+    def flush_writes(self) -> Tuple[int, int]:
+        """
+        Commits all queued writes in one transaction: one UPDATE per task (with every queued
+        column), then the queued focus sessions. Returns (tasks updated, sessions logged).
+        If the commit fails the writes stay queued and the error is raised.
+        """
+        with self._writes.flush_lock:
+            updates, sessions = self._writes.take()
+            if not updates and not sessions:
+                return 0, 0
+            by_columns: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+            for task_id, values in updates.items():
+                columns: Tuple[str, ...] = tuple(sorted(values))
+                by_columns.setdefault(columns, []).append((*(values[c] for c in columns), task_id))
+            try:
+                with self._get_connection() as conn:
+                    for columns, rows in by_columns.items():
+                        assignments: str = ", ".join(f"{column} = ?" for column in columns)
+                        conn.executemany(f"UPDATE tasks SET {assignments} WHERE id = ?", rows)
+                    if updates:
+                        self._bump_version(conn, "tasks")
+                    for task_id, duration_minutes, start_time in sessions:
+                        self._log_focus_session(conn, task_id, duration_minutes, start_time)
+            except Exception:
+                self._writes.restore()
+                raise
+            self._writes.done()
+            return len(updates), len(sessions)
 
     # --- FOCUS SESSIONS ---
+    @instrumented("db")
     def log_focus_session(self, task_id: Optional[str], duration_minutes: int) -> None:
-        """Logs a focus session to the database."""
+        """Logs a focus session and updates the daily rollup in the same transaction."""
+        with self._get_connection() as conn:
+            self._log_focus_session(conn, task_id, duration_minutes)
+
+    def _log_focus_session(self, conn: sqlite3.Connection, task_id: Optional[str], duration_minutes: int, start_time: Optional[str] = None) -> None:
+        """Inserts a focus session and its rollup increment inside the caller's transaction."""
         session_id: str = str(uuid.uuid4())
-        start_time: str = datetime.now().isoformat()
+        start_time = start_time or datetime.now().isoformat()
+        conn.execute(
+            "INSERT INTO focus_sessions (id, task_id, start_time, duration_minutes) VALUES (?, ?, ?, ?)",
+            (session_id, task_id, start_time, duration_minutes)
+        )
+        conn.execute("""
+            INSERT INTO focus_daily_rollup (day, task_id, category, minutes, sessions)
+            VALUES (?, ?, COALESCE((SELECT category FROM tasks WHERE id = ?), 'Uncategorized'), ?, 1)
+            ON CONFLICT(day, task_id, category) DO UPDATE SET
+                minutes = minutes + excluded.minutes,
+                sessions = sessions + 1
+        """, (start_time[:10], task_id or "", task_id, duration_minutes or 0))
+        self._bump_version(conn, "focus")
+
+    @instrumented("db")
+    def rebuild_focus_rollup(self) -> int:
+        """
+        Recomputes focus_daily_rollup from focus_sessions (one-off backfill or repair).
+        Sessions are attributed to the task's current category. Returns the number of rollup rows.
+        """
+        with self._get_connection() as conn:
+            self._rebuild_focus_rollup(conn)
+            return conn.execute("SELECT COUNT(*) FROM focus_daily_rollup").fetchone()[0]
+
+    def _rebuild_focus_rollup(self, conn: sqlite3.Connection) -> None:
+        """Replaces the rollup contents inside the caller's transaction."""
+        conn.execute("DELETE FROM focus_daily_rollup")
+        conn.execute("""
+            INSERT INTO focus_daily_rollup (day, task_id, category, minutes, sessions)
+            SELECT substr(s.start_time, 1, 10), IFNULL(s.task_id, ''), COALESCE(t.category, 'Uncategorized'),
+                   SUM(IFNULL(s.duration_minutes, 0)), COUNT(*)
+            FROM focus_sessions s
+            LEFT JOIN tasks t ON t.id = s.task_id
+            GROUP BY 1, 2, 3
+        """)
+        self._bump_version(conn, "focus")
+
+    @staticmethod
+    def _day_filters(since: Optional[str], until: Optional[str]) -> Tuple[str, List[Any]]:
+        """Builds a WHERE clause on the rollup day (YYYY-MM-DD, since inclusive, until exclusive)."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("r.day >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.day < ?")
+            params.append(until)
+        where: str = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    @instrumented("db")
+    def get_focus_stats(self, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves daily aggregated focus session statistics from the rollup table."""
+        if self._writes.has_sessions():
+            self.flush_writes()
+        where, params = self._day_filters(since, until)
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = conn.execute(f"""
+                SELECT r.day as date, SUM(r.minutes) as minutes
+                FROM focus_daily_rollup r{where}
+                GROUP BY r.day
+                ORDER BY r.day DESC
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("db")
+    def get_focus_breakdown(self, by: str = "category", since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieves focus minutes and session counts per category or per task from the rollup table.
+        by is "category" (keys: category) or "task" (keys: task_id, name).
+        """
+        if self._writes.has_sessions() or (by == "task" and self._writes.overlay()):
+            self.flush_writes()
+        where, params = self._day_filters(since, until)
+        if by == "category":
+            query: str = f"""
+                SELECT r.category as category, SUM(r.minutes) as minutes, SUM(r.sessions) as sessions
+                FROM focus_daily_rollup r{where}
+                GROUP BY r.category
+                ORDER BY minutes DESC
+            """
+        elif by == "task":
+            query = f"""
+                SELECT r.task_id as task_id, t.name as name, SUM(r.minutes) as minutes, SUM(r.sessions) as sessions
+                FROM focus_daily_rollup r
+                LEFT JOIN tasks t ON t.id = r.task_id{where}
+                GROUP BY r.task_id
+                ORDER BY minutes DESC
+            """
+        else:
+            raise ValueError(f"Unknown focus breakdown: {by}")
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = conn.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("db")
+    def get_focus_sessions(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        task_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[FocusSession]:
+        """Individual focus sessions, newest first. since/until are ISO timestamps (inclusive/exclusive)."""
+        if self._writes.has_sessions():
+            self.flush_writes()
+        clauses: List[str] = []
+        params: List[Any] = []
+        for clause, value in (("start_time >= ?", since), ("start_time < ?", until), ("task_id = ?", task_id)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        query: str = f"SELECT {FOCUS_SESSION_SELECT} FROM focus_sessions"
+        if clauses:
+            query += f" WHERE {' AND '.join(clauses)}"
+        query += " ORDER BY start_time DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.row_factory = focus_session_factory
+            return cursor.execute(query, params).fetchall()
+
+    # --- ACTIVE TIMERS ---
+    @instrumented("db")
+    def create_timer(self, task_id: Optional[str], mode: str, duration_seconds: int, now: float) -> str:
+        """Persists a new running timer and returns its id."""
+        timer_id: str = str(uuid.uuid4())
         with self._get_connection() as conn:
             conn.execute(
-                "INSERT INTO focus_sessions (id, task_id, start_time, duration_minutes) VALUES (?, ?, ?, ?)",
-                (session_id, task_id, start_time, duration_minutes)
+                "INSERT INTO active_timers (id, task_id, mode, state, duration_seconds, elapsed_seconds, resumed_at, started_at, updated_at) VALUES (?, ?, ?, 'running', ?, 0, ?, ?, ?)",
+                (timer_id, task_id, mode, duration_seconds, now, now, now)
             )
+        return timer_id
 
-    def get_focus_stats(self) -> List[Dict[str, Any]]:
-        """Retrieves daily aggregated focus session statistics."""
+    @instrumented("db")
+    def get_timer(self, timer_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieves a persisted timer."""
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor: sqlite3.Cursor = conn.execute("""
-                SELECT substr(start_time, 1, 10) as date, SUM(duration_minutes) as minutes
-                FROM focus_sessions
-                GROUP BY date
-                ORDER BY date DESC
-            """)
-            return [dict(row) for row in cursor.fetchall()]
+            row: Optional[sqlite3.Row] = conn.execute("SELECT * FROM active_timers WHERE id = ?", (timer_id,)).fetchone()
+            return dict(row) if row else None
+
+    @instrumented("db")
+    def update_timer(self, timer_id: str, from_states: Iterable[str], state: str, elapsed_seconds: float, resumed_at: Optional[float], now: float) -> bool:
+        """Moves a timer to a new state if it is currently in one of from_states. Returns whether it changed."""
+        states: List[str] = list(from_states)
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = conn.execute(
+                f"UPDATE active_timers SET state = ?, elapsed_seconds = ?, resumed_at = ?, updated_at = ? WHERE id = ? AND state IN ({', '.join('?' * len(states))})",
+                (state, elapsed_seconds, resumed_at, now, timer_id, *states)
+            )
+            return cursor.rowcount == 1
+
+    @instrumented("db")
+    def finish_timer(self, timer_id: str, state: str, elapsed_seconds: float, log_minutes: Optional[int], now: float) -> bool:
+        """
+        Moves a running or paused timer to a terminal state and, if log_minutes is given, logs its
+        focus session in the same transaction. A timer is finished (and logged) at most once.
+        """
+        with self._get_connection() as conn:
+            cursor: sqlite3.Cursor = conn.execute(
+                "UPDATE active_timers SET state = ?, elapsed_seconds = ?, resumed_at = NULL, logged = ?, updated_at = ? WHERE id = ? AND state IN ('running', 'paused')",
+                (state, elapsed_seconds, log_minutes is not None, now, timer_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+            if log_minutes is not None:
+                row: sqlite3.Row = conn.execute("SELECT task_id, started_at FROM active_timers WHERE id = ?", (timer_id,)).fetchone()
+                started: str = datetime.fromtimestamp(row["started_at"]).isoformat()
+                self._log_focus_session(conn, row["task_id"], log_minutes, started)
+            return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Database maintenance commands.")
+    parser.add_argument("command", choices=["rebuild-rollup", "rebuild-search"])
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to the SQLite database")
+    args = parser.parse_args()
+
+    if args.command == "rebuild-rollup":
+        rows: int = DatabaseManager(args.db).rebuild_focus_rollup()
+        print(f"Rebuilt focus_daily_rollup: {rows} rows")
+    elif args.command == "rebuild-search":
+        DatabaseManager(args.db).rebuild_search_index()
+        print("Rebuilt tasks_fts")
@@ -1,35 +1,364 @@
+import threading
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from functools import cached_property
+from itertools import combinations, count
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+from sortedcontainers import SortedList
+from config.settings import (
+    POMODORO_DURATION, SHORT_BREAK_DURATION, LONG_BREAK_DURATION, POMODOROS_BEFORE_LONG_BREAK,
+    TARGET_DAILY_MINUTES, SCHEDULER_LOOKAHEAD,
+)
+from modules.records import Task
+# Value per planned minute when the knapsack step has to choose between tasks
+PRIORITY_WEIGHTS: Dict[int, int] = {1: 4, 2: 2, 3: 1}
+
+# (completed, priority rank, duration) - the Phase 2 ordering
+ScheduleKey = Tuple[bool, int, int]
+
+
+def schedule_key(task: Task) -> ScheduleKey:
+    """Sort key shared by prioritize_tasks and TaskScheduler (missing duration counts as 60m)."""
+    return (task.completed, task.priority_rank, task.duration or 60) # Incomplete (False) < Complete (True)
+
+
+class TaskScheduler:
+    """
+    Incrementally ordered view of a task list.
+    Tasks are kept as (schedule key, sequence) entries in a SortedList, so insert, update,
+    complete and remove cost O(log n) instead of a full re-sort, top(k) costs O(log n + k) and a
+    page of ordered() O(log n + page size). The planned capacity (minutes of incomplete tasks)
+    is maintained as a running total. The sequence number keeps ties in insertion order, like
+    the stable sort in prioritize_tasks.
+    """
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        self._tasks: Dict[str, Task] = {}
+        self._entries: Dict[str, Tuple[ScheduleKey, int]] = {}
+        self._order: "SortedList[Tuple[ScheduleKey, int, str]]" = SortedList()
+        self._sequence: Iterator[int] = count()
+        self._incomplete: int = 0
+        self._capacity: int = 0
+        self._lock: threading.RLock = threading.RLock()
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._tasks
+
+    @staticmethod
+    def _planned_minutes(task: Task) -> int:
+        """Minutes a task contributes to capacity (same rule as calculate_capacity)."""
+        return 0 if task.completed else task.duration or 0
+
+    def add(self, task: Task, sequence: Optional[int] = None) -> None:
+        """Inserts a task (or replaces it if its id is already present)."""
+        with self._lock:
+            if task.id in self._tasks:
+                sequence = self._entries[task.id][1] if sequence is None else sequence
+                self.remove(task.id)
+            key: ScheduleKey = schedule_key(task)
+            seq: int = next(self._sequence) if sequence is None else sequence
+            self._order.add((key, seq, task.id))
+            self._tasks[task.id] = task
+            self._entries[task.id] = (key, seq)
+            self._capacity += self._planned_minutes(task)
+            self._incomplete += not key[0]
+
+    def remove(self, task_id: str) -> Optional[Task]:
+        """Removes a task and returns it (None if unknown)."""
+        with self._lock:
+            task: Optional[Task] = self._tasks.pop(task_id, None)
+            if task is None:
+                return None
+            key, seq = self._entries.pop(task_id)
+            self._order.remove((key, seq, task_id))
+            self._capacity -= self._planned_minutes(task)
+            self._incomplete -= not key[0]
+            return task
+
+    def update(self, task_id: str, **changes: Any) -> None:
+        """Applies field changes to a task and moves it to its new position, keeping its tie order."""
+        with self._lock:
+            task: Optional[Task] = self._tasks.get(task_id)
+            if task is None:
+                return
+            self.add(replace(task, **changes), sequence=self._entries[task_id][1])
+
+    def complete(self, task_id: str, completed: bool = True) -> None:
+        self.update(task_id, completed=completed)
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def top(self, k: Optional[int] = None) -> List[Task]:
+        """The next k incomplete tasks in priority order (all incomplete tasks if k is None)."""
+        with self._lock:
+            limit: int = self._incomplete if k is None else min(k, self._incomplete)
+            return [self._tasks[entry[2]] for entry in self._order.islice(0, limit)]
+
+    def ordered(self, offset: int = 0, limit: Optional[int] = None) -> List[Task]:
+        """All tasks in prioritize_tasks order, optionally sliced for pagination."""
+        with self._lock:
+            stop: Optional[int] = None if limit is None else offset + limit
+            return [self._tasks[entry[2]] for entry in self._order.islice(offset, stop)]
+
+    @property
+    def remaining_capacity(self) -> int:
+        """Total minutes planned for incomplete tasks."""
+        return self._capacity
+
+    @property
+    def incomplete_count(self) -> int:
+        return self._incomplete
+
+
+@dataclass
+class ScheduleBlock:
+    """One contiguous slot of the day: focus on a task, or a break."""
+    start: datetime
+    end: datetime
+    kind: str  # "focus", "short_break" or "long_break"
+    task: Optional[Task] = None
+
+    @property
+    def minutes(self) -> int:
+        return int((self.end - self.start).total_seconds() // 60)
+
+    @property
+    def label(self) -> str:
+        if self.kind == "focus" and self.task:
+            return f"{self.task.name} ({self.task.priority}, {self.task.category or 'Uncategorized'})"
+        return {"short_break": "Short break", "long_break": "Long break"}.get(self.kind, "Focus")
+
+
+@dataclass
+class DaySchedule:
+    """
+    Result of ExecutionEngine.plan_day. `deferred` counts the incomplete tasks that did not fit;
+    the tasks themselves (`overflow`) are only listed on first access, since planning from a
+    TaskScheduler reads just the head of the queue.
+    """
+    blocks: List[ScheduleBlock] = field(default_factory=list)
+    scheduled: List[Task] = field(default_factory=list)
+    focus_capacity: int = 0
+    deferred: int = 0
+    deferred_tasks: Callable[[], List[Task]] = field(default=list, repr=False, compare=False)
+
+    @cached_property
+    def overflow(self) -> List[Task]:
+        """Deferred tasks in priority order."""
+        return self.deferred_tasks()
+
+    @property
+    def focus_minutes(self) -> int:
+        return sum(block.minutes for block in self.blocks if block.kind == "focus")
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Table-friendly rows (Start, End, Block, Minutes)."""
+        return [
+            {"Start": b.start.strftime("%H:%M"), "End": b.end.strftime("%H:%M"), "Block": b.label, "Minutes": b.minutes}
+            for b in self.blocks
+        ]
+
+    def to_text(self) -> str:
+        """
+        Compact one-line-per-block rendering, used as LLM context. Blocks are placed by their
+        offset from the start of the day (+h:mm) rather than the clock time, so the same plan
+        renders the same prompt at any time of day and the response cache can hit.
+        """
+        if not self.blocks:
+            return ""
+        day_start: datetime = self.blocks[0].start
+        lines: List[str] = []
+        for b in self.blocks:
+            offset: int = int((b.start - day_start).total_seconds() // 60)
+            lines.append(f"- +{offset // 60}:{offset % 60:02d} {b.minutes}m {b.label}")
+        return "\n".join(lines)
+
 
 class ExecutionEngine:
     def __init__(self) -> None:
         pass
 
-    def prioritize_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def prioritize_tasks(self, tasks: List[Task]) -> List[Task]:
         """
         Sorts tasks based on Phase 2 algorithm:
         1. Incomplete First
         2. Priority (High > Medium > Low)
         3. Duration (Short > Long)
         """
-        priority_map: Dict[str, int] = {"High": 1, "Medium": 2, "Low": 3}
-        
-        def get_duration(t: Dict[str, Any]) -> int:
-            """Helper to safely get duration (default to 60 if None/0)."""
-            return t.get("duration") if t.get("duration") else 60
+        return sorted(tasks, key=schedule_key)
 
-        return sorted(tasks, key=lambda x: (
-            x.get("completed", False), # Incomplete (False) < Complete (True)
-            priority_map.get(x.get("priority", "Low"), 3),
-            get_duration(x)
-        ))
-
-    def calculate_capacity(self, tasks: List[Dict[str, Any]]) -> int:
+    def calculate_capacity(self, tasks: List[Task]) -> int:
         """
         Returns total minutes planned for incomplete tasks.
         """
         total_mins: int = 0
         for task in tasks:
-            if not task.get("completed"):
-                 total_mins += task.get("duration") if task.get("duration") else 0
+            if not task.completed:
+                total_mins += task.duration or 0
         return total_mins
+
+    def build_scheduler(self, tasks: Iterable[Task]) -> TaskScheduler:
+        """Creates an incrementally maintained scheduler over tasks (same order as prioritize_tasks)."""
+        return TaskScheduler(tasks)
+
+    # --- TIME BLOCKING ---
+    @staticmethod
+    def _planned_duration(task: Task) -> int:
+        return task.duration or 60
+
+    @staticmethod
+    def focus_capacity(
+        day_minutes: int = TARGET_DAILY_MINUTES,
+        pomodoro: int = POMODORO_DURATION,
+        short_break: int = SHORT_BREAK_DURATION,
+        long_break: int = LONG_BREAK_DURATION,
+        long_break_every: int = POMODOROS_BEFORE_LONG_BREAK,
+    ) -> int:
+        """Focus minutes that fit in a workday once pomodoro breaks are taken."""
+        elapsed: int = 0
+        focus: int = 0
+        pomodoros: int = 0
+        while elapsed < day_minutes:
+            slot: int = min(pomodoro, day_minutes - elapsed)
+            focus += slot
+            elapsed += slot
+            pomodoros += 1
+            elapsed += long_break if pomodoros % long_break_every == 0 else short_break
+        return focus
+
+    def select_tasks(
+        self,
+        tasks: List[Task],
+        capacity: int,
+        lookahead: int = SCHEDULER_LOOKAHEAD,
+        presorted: bool = False,
+    ) -> Tuple[List[Task], List[Task]]:
+        """
+        Picks incomplete tasks for the day: greedily in priority order while they fit, then a
+        bounded knapsack over the next `lookahead` candidates to fill the remaining minutes
+        (value = priority weight x minutes). Returns (selected, overflow), both in priority order.
+        Pass presorted=True when tasks are already in prioritize_tasks order.
+        """
+        candidates: List[Task] = [t for t in (tasks if presorted else self.prioritize_tasks(tasks)) if not t.completed]
+        selected, overflow, _ = self._select_candidates(candidates, capacity, lookahead)
+        return selected, overflow
+
+    def select_scheduled(self, scheduler: TaskScheduler, capacity: int, lookahead: int = SCHEDULER_LOOKAHEAD) -> Tuple[List[Task], List[Task], int]:
+        """
+        select_tasks over a TaskScheduler's own order, reading only the head of the queue: the
+        greedy fill stops at the first task that does not fit, so top(k) is fetched for a growing
+        k until that task and the lookahead window behind it are covered.
+        Returns (selected, overflow among the examined tasks, number of tasks examined).
+        """
+        k: int = max(32, 4 * lookahead)
+        while True:
+            candidates: List[Task] = scheduler.top(k)
+            selected, overflow, needed = self._select_candidates(candidates, capacity, lookahead)
+            if len(candidates) < k or needed <= len(candidates):
+                return selected, overflow, len(candidates)
+            k *= 2
+
+    def _select_candidates(self, candidates: List[Task], capacity: int, lookahead: int) -> Tuple[List[Task], List[Task], int]:
+        """Greedy fill plus knapsack over incomplete, prioritized candidates; also returns how many candidates were needed."""
+        selected: List[Task] = []
+        remaining: int = capacity
+        index: int = 0
+        while index < len(candidates) and self._planned_duration(candidates[index]) <= remaining:
+            remaining -= self._planned_duration(candidates[index])
+            selected.append(candidates[index])
+            index += 1
+
+        window: List[Task] = candidates[index:index + lookahead]
+        best: Tuple[int, ...] = ()
+        best_value: int = 0
+        for size in range(1, len(window) + 1):
+            for combo in combinations(range(len(window)), size):
+                minutes: int = sum(self._planned_duration(window[i]) for i in combo)
+                if minutes > remaining:
+                    continue
+                value: int = sum(PRIORITY_WEIGHTS[window[i].priority_rank] * self._planned_duration(window[i]) for i in combo)
+                if value > best_value:
+                    best, best_value = combo, value
+        chosen_ids = {window[i].id for i in best}
+        selected += [t for t in window if t.id in chosen_ids]
+        overflow: List[Task] = [t for t in candidates[index:] if t.id not in chosen_ids]
+        return selected, overflow, index + lookahead
+
+    @staticmethod
+    def group_by_category(tasks: List[Task]) -> List[Task]:
+        """
+        Orders tasks so categories are contiguous (fewer context switches). Groups follow the
+        order in which their category first appears in tasks; priority order is kept within a group.
+        """
+        groups: Dict[str, List[Task]] = {}
+        for task in tasks:
+            groups.setdefault(task.category or "Uncategorized", []).append(task)
+        return [task for group in groups.values() for task in group]
+
+    def plan_day(
+        self,
+        tasks: Union[List[Task], TaskScheduler],
+        start: Optional[datetime] = None,
+        day_minutes: int = TARGET_DAILY_MINUTES,
+        pomodoro: int = POMODORO_DURATION,
+        short_break: int = SHORT_BREAK_DURATION,
+        long_break: int = LONG_BREAK_DURATION,
+        long_break_every: int = POMODOROS_BEFORE_LONG_BREAK,
+        lookahead: int = SCHEDULER_LOOKAHEAD,
+    ) -> DaySchedule:
+        """
+        Deterministic time-blocking: packs incomplete tasks into pomodoro focus slots with
+        short/long breaks over a workday of day_minutes, starting at `start` (default: now,
+        rounded up to 5 minutes). Tasks longer than a pomodoro continue after the break.
+        Given a TaskScheduler, its order is used as-is and only the tasks the day can reach are
+        read (see select_scheduled); the deferred tail is listed only if overflow is accessed.
+        """
+        if start is None:
+            now: datetime = datetime.now().replace(second=0, microsecond=0)
+            start = now + timedelta(minutes=-now.minute % 5)
+
+        capacity: int = self.focus_capacity(day_minutes, pomodoro, short_break, long_break, long_break_every)
+        if isinstance(tasks, TaskScheduler):
+            scheduler: TaskScheduler = tasks
+            selected, head, examined = self.select_scheduled(scheduler, capacity, lookahead)
+            pending: int = scheduler.incomplete_count
+            deferred_tasks: Callable[[], List[Task]] = lambda: head + scheduler.ordered(examined, max(pending - examined, 0))
+            deferred: int = pending - len(selected)
+        else:
+            selected, overflow = self.select_tasks(tasks, capacity, lookahead)
+            deferred_tasks, deferred = (lambda: overflow), len(overflow)
+        ordered: List[Task] = self.group_by_category(selected)
+
+        blocks: List[ScheduleBlock] = []
+        clock: datetime = start
+        day_end: datetime = start + timedelta(minutes=day_minutes)
+        slot_left: int = pomodoro
+        pomodoros: int = 0
+        for task in ordered:
+            task_left: int = self._planned_duration(task)
+            while task_left > 0 and clock < day_end:
+                if slot_left == 0:
+                    pomodoros += 1
+                    kind: str = "long_break" if pomodoros % long_break_every == 0 else "short_break"
+                    pause: int = long_break if kind == "long_break" else short_break
+                    blocks.append(ScheduleBlock(clock, clock + timedelta(minutes=pause), kind))
+                    clock += timedelta(minutes=pause)
+                    slot_left = pomodoro
+                    continue
+                minutes: int = min(task_left, slot_left, int((day_end - clock).total_seconds() // 60))
+                if minutes <= 0:
+                    break
+                if blocks and blocks[-1].kind == "focus" and blocks[-1].task is task:
+                    blocks[-1].end += timedelta(minutes=minutes)
+                else:
+                    blocks.append(ScheduleBlock(clock, clock + timedelta(minutes=minutes), "focus", task))
+                clock += timedelta(minutes=minutes)
+                task_left -= minutes
+                slot_left -= minutes
+
+        return DaySchedule(blocks=blocks, scheduled=ordered, focus_capacity=capacity, deferred=deferred, deferred_tasks=deferred_tasks)
@@ -1,9 +1,33 @@
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import streamlit as st
-from groq import Groq, GroqError
 from config.prompts import GROQ_PROMPTS
-from config.settings import GROQ_MODEL
-from typing import Optional, Any, Dict
+from config.settings import (
+    get_settings, LLM_CACHE_ENABLED, GROQ_REQUEST_TIMEOUT_SECONDS,
+    GROQ_MAX_RETRIES, GROQ_RETRY_BASE_DELAY_SECONDS, GROQ_MAX_RETRY_AFTER_SECONDS,
+)
+from modules.llm_cache import ResponseCache, get_response_cache
+from modules.instrumentation import RECORDER
+from typing import TYPE_CHECKING, Optional, Any, Dict, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from groq import Groq
+
+
+def _groq() -> Any:
+    """Imports the groq SDK on first use; it is one of the slowest imports in the app."""
+    import groq
+    return groq
+
+
+def _retryable_errors() -> Tuple[type, ...]:
+    """Transient failures worth retrying: 429s, connection errors and timeouts, and 5xx responses."""
+    groq = _groq()
+    return (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)  # APITimeoutError is an APIConnectionError
+
 
 class GroqClient:
     def __init__(self) -> None:
@@ -14,48 +38,179 @@ class GroqClient:
         elif os.getenv("GROQ_API_KEY"):
             self.api_key = os.getenv("GROQ_API_KEY")
              
-        self.client: Optional[Groq] = None
+        self.client: Optional["Groq"] = None
         if self.api_key:
             try:
-                self.client = Groq(api_key=self.api_key)
+                # Retries are handled by _create_completion with jittered backoff
+                self.client = _groq().Groq(api_key=self.api_key, max_retries=0)
             except Exception as e:
                 st.error(f"Failed to initialize Groq Client: {e}")
                 self.client = None
         else:
             self.client = None
 
-    def get_completion(self, prompt_key: str, **kwargs: Any) -> str:
+        self.model: str = get_settings().groq_model
+        self.max_concurrency: int = get_settings().groq_max_concurrency
+        self.cache: Optional[ResponseCache] = get_response_cache() if LLM_CACHE_ENABLED else None
+
+    @staticmethod
+    def _render_prompt(prompt_key: str, **kwargs: Any) -> Optional[str]:
+        """Fills the prompt template, or returns None for an unknown key."""
+        prompt_template: Optional[str] = GROQ_PROMPTS.get(prompt_key)
+        if not prompt_template:
+            return None
+        return prompt_template.format(**kwargs)
+
+    def _create_completion(self, prompt: str, stream: bool = False, timeout: float = GROQ_REQUEST_TIMEOUT_SECONDS) -> Any:
+        """
+        Sends one chat completion request (each attempt limited to `timeout` seconds), retrying
+        transient errors (_retryable_errors) with jittered exponential backoff. A Retry-After
+        header is honored up to GROQ_MAX_RETRY_AFTER_SECONDS.
+        """
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            try:
+                return self.client.chat.completions.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        }
+                    ],
+                    model=self.model,
+                    stream=stream,
+                    timeout=timeout,
+                )
+            except _retryable_errors() as e:
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                delay: float = random.uniform(0, GROQ_RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+                response: Any = getattr(e, "response", None)  # Connection errors have no response
+                retry_after: Optional[str] = response.headers.get("retry-after") if response is not None else None
+                if retry_after and retry_after.replace(".", "", 1).isdigit():
+                    delay = max(delay, min(float(retry_after), GROQ_MAX_RETRY_AFTER_SECONDS))
+                time.sleep(delay)
+
+    def get_completion(
+        self,
+        prompt_key: str,
+        use_cache: bool = True,
+        timeout: float = GROQ_REQUEST_TIMEOUT_SECONDS,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Renders the prompt and returns the model's answer.
+        Responses are served from the persistent cache unless use_cache is False.
+        """
         if not self.client:
             return "Please configure your GROQ_API_KEY to use AI features."
         
-        prompt_template: Optional[str] = GROQ_PROMPTS.get(prompt_key)
-        if not prompt_template:
+        formatted_prompt: Optional[str] = self._render_prompt(prompt_key, **kwargs)
+        if formatted_prompt is None:
             return "Error: Prompt key not found."
+        
+        # Persistent cache keyed by a stable content hash
+        cache_key: str = ResponseCache.make_key(self.model, prompt_key, formatted_prompt)
+        with RECORDER.timed("llm", prompt_key, cache="miss") as labels:
+            if use_cache and self.cache:
+                cached: Optional[str] = self.cache.get(cache_key)
+                if cached is not None:
+                    labels["cache"] = "hit"
+                    return cached
             
-        formatted_prompt: str = prompt_template.format(**kwargs)
+            try:
+                chat_completion: Any = self._create_completion(formatted_prompt, timeout=timeout)
+                response_content: str = chat_completion.choices[0].message.content
+                usage: Any = getattr(chat_completion, "usage", None)
+                if usage is not None:
+                    labels.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+                
+                # Cache the response (a bypassed lookup still refreshes the entry)
+                if self.cache:
+                    self.cache.put(cache_key, self.model, prompt_key, response_content)
+                return response_content
+                
+            except _groq().GroqError as e:
+                labels["error"] = type(e).__name__
+                return f"Groq API Error: {str(e)}"
+            except Exception as e:
+                labels["error"] = type(e).__name__
+                return f"An unexpected error occurred: {str(e)}"
+
+    def stream_completion(self, prompt_key: str, use_cache: bool = True, **kwargs: Any) -> Iterator[str]:
+        """
+        Same as get_completion, but yields the answer in chunks as they arrive.
+        The full response is cached once the stream has been consumed completely.
+        """
+        if not self.client:
+            yield "Please configure your GROQ_API_KEY to use AI features."
+            return
+        
+        formatted_prompt: Optional[str] = self._render_prompt(prompt_key, **kwargs)
+        if formatted_prompt is None:
+            yield "Error: Prompt key not found."
+            return
         
-        # Simple Session State Caching
-        cache_key: str = f"groq_cache_{hash(formatted_prompt)}"
-        if cache_key in st.session_state:
-            return st.session_state[cache_key]
+        cache_key: str = ResponseCache.make_key(self.model, prompt_key, formatted_prompt)
+        started: float = time.perf_counter()
+        if use_cache and self.cache:
+            cached: Optional[str] = self.cache.get(cache_key)
+            if cached is not None:
+                RECORDER.record("llm", prompt_key, (time.perf_counter() - started) * 1000, cache="hit", stream=True)
+                yield cached
+                return
         
+        labels: Dict[str, Any] = {"cache": "miss", "stream": True}
         try:
-            chat_completion: Any = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": formatted_prompt,
-                    }
-                ],
-                model=GROQ_MODEL, # Use the centralized model name
-            )
-            response_content: str = chat_completion.choices[0].message.content
+            stream: Any = self._create_completion(formatted_prompt, stream=True)
+            parts: List[str] = []
+            for chunk in stream:
+                delta: Optional[str] = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not parts:
+                        labels["first_token_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    parts.append(delta)
+                    yield delta
             
-            # Cache the response
-            st.session_state[cache_key] = response_content
-            return response_content
+            if self.cache and parts:
+                self.cache.put(cache_key, self.model, prompt_key, "".join(parts))
             
-        except GroqError as e:
-            return f"Groq API Error: {str(e)}"
+        except _groq().GroqError as e:
+            labels["error"] = type(e).__name__
+            yield f"Groq API Error: {str(e)}"
         except Exception as e:
-            return f"An unexpected error occurred: {str(e)}"
+            labels["error"] = type(e).__name__
+            yield f"An unexpected error occurred: {str(e)}"
+        finally:
+            RECORDER.record("llm", prompt_key, (time.perf_counter() - started) * 1000, **labels)
+
+
+    def get_completions(
+        self,
+        requests: Dict[str, Dict[str, Any]],
+        use_cache: bool = True,
+        timeout: float = GROQ_REQUEST_TIMEOUT_SECONDS,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Runs several prompts concurrently on a pool capped at max_workers (default:
+        Settings.groq_max_concurrency), so e.g. the morning briefing waits for the slowest
+        prompt instead of the sum of all three. Maps each prompt key to its template
+        arguments and returns prompt key -> response; failures come back as error text,
+        like get_completion. timeout applies to each request attempt.
+        """
+        if not requests:
+            return {}
+        workers: int = max(1, min(max_workers or self.max_concurrency, len(requests)))
+        with RECORDER.timed("llm", "get_completions", prompts=len(requests), workers=workers):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq") as executor:
+                futures = {
+                    prompt_key: executor.submit(self.get_completion, prompt_key, use_cache, timeout, **prompt_kwargs)
+                    for prompt_key, prompt_kwargs in requests.items()
+                }
+                return {prompt_key: future.result() for prompt_key, future in futures.items()}
+
+
+@lru_cache(maxsize=None)
+def get_groq_client() -> GroqClient:
+    """Returns the process-wide client, created (and the SDK imported) on first use."""
+    return GroqClient()
@@ -0,0 +1,191 @@
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import SHARD_MAX_OPEN
+from modules.database import DatabaseManager
+from modules.instrumentation import instrumented
+
+# Bit i of a habit's history is the day BASE_DATE + i; each stored year holds one bit per day of the year
+BASE_DATE: date = date(2000, 1, 1)
+YEAR_BYTES: int = 46  # 366 bits
+
+
+def day_offset(day: date) -> int:
+    """Position of a day in a history bitset."""
+    if day < BASE_DATE:
+        raise ValueError(f"Habit check-ins before {BASE_DATE} are not supported")
+    return day.toordinal() - BASE_DATE.toordinal()
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def is_done(bits: int, day: date) -> bool:
+    return bool(bits >> day_offset(day) & 1)
+
+
+def count_between(bits: int, start: date, end: date) -> int:
+    """Check-ins on days in [start, end)."""
+    first: int = day_offset(start)
+    return popcount(bits >> first & ((1 << (day_offset(end) - first)) - 1))
+
+
+def current_streak(bits: int, today: date) -> int:
+    """Consecutive check-ins ending today, or yesterday while today is still open."""
+    last: int = day_offset(today)
+    if not bits >> last & 1:
+        last -= 1
+        if last < 0 or not bits >> last & 1:
+            return 0
+    window: int = (1 << (last + 1)) - 1
+    misses: int = ~bits & window
+    return last + 1 if not misses else last - (misses.bit_length() - 1)
+
+
+def longest_streak(bits: int) -> int:
+    """Longest run of consecutive check-ins (each pass shortens every run by one day)."""
+    longest: int = 0
+    while bits:
+        bits &= bits >> 1
+        longest += 1
+    return longest
+
+
+@dataclass(frozen=True)
+class HabitSummary:
+    habit_id: str
+    name: str
+    done_today: bool
+    current_streak: int
+    longest_streak: int
+    week_completed: int  # Check-ins in the last 7 days, today included
+    total_checkins: int
+
+
+class HabitStore:
+    """
+    Habits with daily check-ins stored as packed bitsets: one BLOB of YEAR_BYTES per habit and year
+    in habit_checkins. A habit's whole history is rebuilt into a single Python int, memoized on the
+    "habits" data version, so streaks and weekly counts are a few shifts and masks.
+    """
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db: DatabaseManager = db
+        self._histories: Optional[Tuple[int, Dict[str, int]]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    # --- WRITE ---
+    @instrumented("db", "habits.add_habit")
+    def add_habit(self, name: str) -> str:
+        habit_id: str = str(uuid.uuid4())
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO habits (id, name, created_at) VALUES (?, ?, ?)", (habit_id, name, datetime.now().isoformat()))
+            self.db.bump_versions(conn, "habits")
+        return habit_id
+
+    @instrumented("db", "habits.delete_habit")
+    def delete_habit(self, habit_id: str) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM habit_checkins WHERE habit_id = ?", (habit_id,))
+            conn.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+            self.db.bump_versions(conn, "habits")
+
+    @instrumented("db", "habits.check_in")
+    def check_in(self, habit_id: str, day: Optional[date] = None, done: bool = True) -> None:
+        """Sets (or clears) the habit's bit for a day by rewriting that year's BLOB."""
+        day = day or date.today()
+        day_offset(day)  # Rejects days before BASE_DATE
+        bit: int = 1 << (day.timetuple().tm_yday - 1)
+        with self.db.transaction(immediate=True) as conn:  # Read-modify-write: concurrent check-ins must not overwrite each other
+            row = conn.execute("SELECT bits FROM habit_checkins WHERE habit_id = ? AND year = ?", (habit_id, day.year)).fetchone()
+            word: int = int.from_bytes(row["bits"], "little") if row else 0
+            word = word | bit if done else word & ~bit
+            conn.execute(
+                "INSERT INTO habit_checkins (habit_id, year, bits) VALUES (?, ?, ?) ON CONFLICT(habit_id, year) DO UPDATE SET bits = excluded.bits",
+                (habit_id, day.year, word.to_bytes(YEAR_BYTES, "little"))
+            )
+            self.db.bump_versions(conn, "habits")
+
+    # --- READ ---
+    @instrumented("db", "habits.get_habits")
+    def get_habits(self) -> List[Dict[str, Any]]:
+        with self.db.transaction() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM habits ORDER BY created_at").fetchall()]
+
+    def histories(self) -> Dict[str, int]:
+        """Every habit's history bitset, rebuilt only after a habit write."""
+        (version,) = self.db.data_versions(("habits",))
+        with self._lock:
+            if self._histories and self._histories[0] == version:
+                return self._histories[1]
+        histories: Dict[str, int] = {}
+        with self.db.transaction() as conn:
+            for row in conn.execute("SELECT habit_id, year, bits FROM habit_checkins"):
+                word: int = int.from_bytes(row["bits"], "little")
+                histories[row["habit_id"]] = histories.get(row["habit_id"], 0) | word << day_offset(date(row["year"], 1, 1))
+        with self._lock:
+            self._histories = (version, histories)
+        return histories
+
+    def history(self, habit_id: str) -> int:
+        return self.histories().get(habit_id, 0)
+
+    # --- VIEWS ---
+    def summaries(self, today: Optional[date] = None) -> List[HabitSummary]:
+        today = today or date.today()
+        histories: Dict[str, int] = self.histories()
+        week_start: date = today - timedelta(days=6)
+        summaries: List[HabitSummary] = []
+        for habit in self.get_habits():
+            bits: int = histories.get(habit["id"], 0)
+            summaries.append(HabitSummary(
+                habit_id=habit["id"],
+                name=habit["name"],
+                done_today=is_done(bits, today),
+                current_streak=current_streak(bits, today),
+                longest_streak=longest_streak(bits),
+                week_completed=count_between(bits, week_start, today + timedelta(days=1)),
+                total_checkins=popcount(bits),
+            ))
+        return summaries
+
+    def weekly_chart_data(self, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Habits completed on each of the last 7 days, in the format render_habit_chart expects."""
+        today = today or date.today()
+        habits: List[Dict[str, Any]] = self.get_habits()
+        histories: Dict[str, int] = self.histories()
+        rows: List[Dict[str, Any]] = []
+        for days_ago in range(6, -1, -1):
+            day: date = today - timedelta(days=days_ago)
+            completed: int = sum(is_done(histories.get(habit["id"], 0), day) for habit in habits)
+            rows.append({"day": day.strftime("%a"), "completed": completed, "total": len(habits)})
+        return rows if habits else []
+
+    def prompt_data(self, today: Optional[date] = None, days: int = 28) -> str:
+        """Text for the habit_tracking prompt: streaks, recent check-ins and most-missed weekdays."""
+        today = today or date.today()
+        histories: Dict[str, int] = self.histories()
+        recent: List[date] = [today - timedelta(days=n) for n in range(days - 1, -1, -1)]
+        lines: List[str] = []
+        for summary in self.summaries(today):
+            bits: int = histories.get(summary.habit_id, 0)
+            pattern: str = "".join("✓" if is_done(bits, day) else "·" for day in recent)
+            misses: Dict[str, int] = {}
+            for day in recent[:-1]:  # Today is still open
+                if not is_done(bits, day):
+                    misses[day.strftime("%a")] = misses.get(day.strftime("%a"), 0) + 1
+            most_missed: str = ", ".join(d for d, n in sorted(misses.items(), key=lambda item: -item[1])[:2]) or "none"
+            lines.append(
+                f"- {summary.name}: current streak {summary.current_streak} days (longest {summary.longest_streak}), "
+                f"{summary.week_completed}/7 days this week, last {days} days oldest to today: {pattern}, most missed: {most_missed}"
+            )
+        return "\n".join(lines) or "No habits tracked yet."
+
+
+@lru_cache(maxsize=SHARD_MAX_OPEN) # One per open database (shard)
+def get_habit_store(db: DatabaseManager) -> HabitStore:
+    """Returns the process-wide habit store for a database, so memoized histories survive reruns."""
+    return HabitStore(db)
@@ -0,0 +1,160 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+from config.settings import INSTRUMENTATION_ENABLED, INSTRUMENTATION_BUFFER_SIZE, SLOW_QUERY_MS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class Measurement:
+    kind: str          # "db", "llm" or "page"
+    name: str          # method, prompt key or page name
+    duration_ms: float
+    timestamp: float
+    labels: Dict[str, Any] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index: int = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """
+    Process-wide, thread-safe ring buffer of timings.
+    Only the most recent `capacity` measurements are kept; per-operation call counts are cumulative.
+    """
+    def __init__(self, capacity: int = INSTRUMENTATION_BUFFER_SIZE, enabled: bool = INSTRUMENTATION_ENABLED) -> None:
+        self.enabled: bool = enabled
+        self._buffer: Deque[Measurement] = deque(maxlen=capacity)
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, kind: str, name: str, duration_ms: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        measurement = Measurement(kind, name, duration_ms, time.time(), labels)
+        with self._lock:
+            self._buffer.append(measurement)
+            self._counts[(kind, name)] = self._counts.get((kind, name), 0) + 1
+
+    @contextmanager
+    def timed(self, kind: str, name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """Times the block; labels added to the yielded dict are recorded with it."""
+        extra: Dict[str, Any] = dict(labels)
+        started: float = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(kind, name, (time.perf_counter() - started) * 1000, **extra)
+
+    def snapshot(self, kind: Optional[str] = None) -> List[Measurement]:
+        with self._lock:
+            measurements: List[Measurement] = list(self._buffer)
+        return [m for m in measurements if kind is None or m.kind == kind]
+
+    def summary(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """p50/p95/max per (kind, name) over the buffered window, slowest p95 first."""
+        grouped: Dict[Tuple[str, str], List[float]] = {}
+        for m in self.snapshot(kind):
+            grouped.setdefault((m.kind, m.name), []).append(m.duration_ms)
+        with self._lock:
+            counts: Dict[Tuple[str, str], int] = dict(self._counts)
+        rows: List[Dict[str, Any]] = []
+        for (k, name), durations in grouped.items():
+            durations.sort()
+            rows.append({
+                "kind": k,
+                "name": name,
+                "samples": len(durations),
+                "total_calls": counts.get((k, name), len(durations)),
+                "p50_ms": round(percentile(durations, 0.50), 3),
+                "p95_ms": round(percentile(durations, 0.95), 3),
+                "max_ms": round(durations[-1], 3),
+            })
+        return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+    def slowest(self, kind: Optional[str] = None, threshold_ms: float = 0.0, limit: int = 20) -> List[Measurement]:
+        candidates: List[Measurement] = [m for m in self.snapshot(kind) if m.duration_ms >= threshold_ms]
+        return sorted(candidates, key=lambda m: m.duration_ms, reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffer.clear()
+            self._counts.clear()
+
+    def export_json(self) -> str:
+        return json.dumps({"summary": self.summary(), "measurements": [asdict(m) for m in self.snapshot()]}, default=str)
+
+    def export_prometheus(self) -> str:
+        """Prometheus text exposition of the summary (quantiles in milliseconds)."""
+        lines: List[str] = [
+            "# HELP apex_operation_duration_ms Operation latency over the recent window.",
+            "# TYPE apex_operation_duration_ms summary",
+        ]
+        for row in self.summary():
+            labels: str = f'kind="{row["kind"]}",name="{row["name"]}"'
+            lines.append(f'apex_operation_duration_ms{{{labels},quantile="0.5"}} {row["p50_ms"]}')
+            lines.append(f'apex_operation_duration_ms{{{labels},quantile="0.95"}} {row["p95_ms"]}')
+            lines.append(f"apex_operation_duration_ms_count{{{labels}}} {row['total_calls']}")
+        return "\n".join(lines) + "\n"
+
+
+RECORDER: Recorder = Recorder()
+
+
+def instrumented(kind: str, name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator recording the wall time of every call under (kind, name or function name)."""
+    def decorator(func: F) -> F:
+        label: str = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not RECORDER.enabled:
+                return func(*args, **kwargs)
+            started: float = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration_ms: float = (time.perf_counter() - started) * 1000
+                # Arguments are only shown in the slow-query list, so fast calls skip describing them
+                if duration_ms >= SLOW_QUERY_MS:
+                    RECORDER.record(kind, label, duration_ms, args=_describe(args[1:], kwargs))
+                else:
+                    RECORDER.record(kind, label, duration_ms)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def _describe(args: Tuple[Any, ...], kwargs: Dict[str, Any], limit: int = 120) -> str:
+    """Short, bounded description of call arguments for the slow-query list."""
+    parts: List[str] = [repr(a) if not isinstance(a, (list, tuple, dict)) else f"<{type(a).__name__} of {len(a)}>" for a in args]
+    parts += [f"{k}={v!r}" for k, v in kwargs.items()]
+    text: str = ", ".join(parts)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class PageRun:
+    """
+    Measures one script run of a Streamlit page. Call stop() in a finally block around the
+    page body: st.rerun() and st.stop() end the script by raising, skipping a trailing call.
+    """
+    def __init__(self, page: str) -> None:
+        self.page: str = page
+        self._started: float = time.perf_counter()
+
+    def stop(self) -> None:
+        RECORDER.record("page", self.page, (time.perf_counter() - self._started) * 1000)
+
+
+def start_page_run(page: str) -> PageRun:
+    return PageRun(page)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Union
+from config.settings import LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES
+from modules.database import ConnectionPool, get_connection_pool
+
+class ResponseCache:
+    """
+    Disk-backed cache of LLM completions stored in SQLite next to the main database.
+    Entries expire after a TTL and the least recently used ones are evicted beyond max_entries.
+    """
+    def __init__(
+        self,
+        db_path: Union[str, Path] = LLM_CACHE_PATH,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds: int = ttl_seconds
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._counter_lock: threading.Lock = threading.Lock()
+        self._pool: ConnectionPool = get_connection_pool(db_path)
+        if not self._pool.schema_ready:
+            with self._pool.init_lock:
+                if not self._pool.schema_ready:
+                    self._init_db()
+                    self._pool.schema_ready = True
+
+    def _init_db(self) -> None:
+        """Creates the cache table if it does not exist."""
+        with self._pool.connection() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                prompt_key TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+
+    @staticmethod
+    def make_key(model: str, prompt_key: str, prompt: str) -> str:
+        """Stable content hash of (model, prompt key, rendered prompt)."""
+        payload: str = json.dumps([model, prompt_key, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, hit: bool) -> None:
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for key, or None if missing or expired."""
+        now: float = time.time()
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._count(row is not None)
+        return row["response"] if row is not None else None
+
+    def put(self, key: str, model: str, prompt_key: str, response: str) -> None:
+        """Stores a response and evicts expired and least recently used entries."""
+        now: float = time.time()
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, prompt_key, response, created_at, last_access, hits) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model, prompt_key, response, now, now)
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        """Removes every cached response."""
+        with self._pool.connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters for this process plus the stored entry count and size."""
+        with self._pool.connection() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), IFNULL(SUM(LENGTH(response)), 0) FROM llm_cache").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+@lru_cache(maxsize=None)
+def get_response_cache(db_path: Union[str, Path] = LLM_CACHE_PATH) -> ResponseCache:
+    """Returns the process-wide response cache so hit/miss counters survive reruns."""
+    return ResponseCache(db_path)
@@ -0,0 +1,67 @@
+import sqlite3
+from dataclasses import dataclass, field
+from sys import intern
+from typing import Any, Dict, Optional, Tuple
+
+PRIORITY_RANKS: Dict[str, int] = {"High": 1, "Medium": 2, "Low": 3}
+
+# Column order of the SELECTs that build records (Task(*row) / FocusSession(*row))
+TASK_COLUMNS: Tuple[str, ...] = ("id", "name", "priority", "duration", "completed", "created_at", "category", "notes", "completed_at")
+FOCUS_SESSION_COLUMNS: Tuple[str, ...] = ("id", "task_id", "start_time", "duration_minutes")
+
+
+@dataclass(slots=True)
+class Task:
+    """
+    One row of the tasks table. completed is a real bool and priority_rank the decoded
+    priority (PRIORITY_RANKS, unknown priorities rank as Low). Instances returned by the
+    cached reads and the scheduler are shared: treat them as read-only and use
+    dataclasses.replace to change a field.
+    """
+    id: str
+    name: str
+    priority: str = "Medium"
+    duration: Optional[int] = 30
+    completed: bool = False
+    created_at: str = ""
+    category: Optional[str] = "Uncategorized"
+    notes: Optional[str] = ""
+    completed_at: Optional[str] = None
+    priority_rank: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.completed = bool(self.completed)
+        self.priority_rank = PRIORITY_RANKS.get(self.priority, 3)
+        # SQLite returns a new string per row; share the few distinct priorities and categories
+        self.priority = intern(self.priority) if self.priority else self.priority
+        self.category = intern(self.category) if self.category else self.category
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The tasks columns as a plain dict (JSON, pandas, st.data_editor)."""
+        return {
+            "id": self.id, "name": self.name, "priority": self.priority, "duration": self.duration,
+            "completed": self.completed, "created_at": self.created_at, "category": self.category,
+            "notes": self.notes, "completed_at": self.completed_at,
+        }
+
+
+@dataclass(slots=True)
+class FocusSession:
+    """One row of the focus_sessions table."""
+    id: str
+    task_id: Optional[str]
+    start_time: str
+    duration_minutes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "task_id": self.task_id, "start_time": self.start_time, "duration_minutes": self.duration_minutes}
+
+
+def task_factory(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> Task:
+    """sqlite3 row factory for SELECTs of TASK_COLUMNS, in that order."""
+    return Task(*row)
+
+
+def focus_session_factory(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> FocusSession:
+    """sqlite3 row factory for SELECTs of FOCUS_SESSION_COLUMNS, in that order."""
+    return FocusSession(*row)
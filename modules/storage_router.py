@@ -0,0 +1,181 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TypeVar, Union
+from config.settings import (
+    SHARDING_ENABLED, SHARD_DIR, SHARD_MODE, SHARD_BUCKETS, SHARD_MAX_OPEN, SHARD_USER_HEADER, SHARD_TRUST_USER_HEADER,
+    SHARD_AGGREGATE_WORKERS,
+)
+from modules.data_cache import CachedDatabaseManager, get_database
+from modules.database import DatabaseManager, close_connection_pool
+
+T = TypeVar("T")
+
+
+class StorageRouter:
+    """
+    Maps users to their own SQLite file under SHARD_DIR, so each user (mode "user") or each hash
+    bucket of users (mode "bucket") has its own writer lock. Handles are opened lazily and the
+    least recently used ones are flushed and closed once more than max_open are open.
+    """
+    def __init__(
+        self,
+        root: Union[str, Path] = SHARD_DIR,
+        mode: str = SHARD_MODE,
+        buckets: int = SHARD_BUCKETS,
+        max_open: int = SHARD_MAX_OPEN,
+    ) -> None:
+        if mode not in ("user", "bucket"):
+            raise ValueError(f"Unknown shard mode: {mode}")
+        self.root: Path = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.mode: str = mode
+        self.buckets: int = buckets
+        self.max_open: int = max_open
+        self._open: "OrderedDict[Path, CachedDatabaseManager]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def shard_name(self, user_id: str) -> str:
+        """Stable file stem for a user's shard."""
+        digest: str = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+        if self.mode == "bucket":
+            return f"bucket_{int(digest[:8], 16) % self.buckets:03d}"
+        # Readable prefix for operators, digest suffix so sanitized ids cannot collide
+        return f"user_{re.sub(r'[^A-Za-z0-9_.-]', '_', user_id)[:40]}_{digest[:10]}"
+
+    def shard_path(self, user_id: str) -> Path:
+        return self.root / f"{self.shard_name(user_id)}.db"
+
+    def get(self, user_id: str) -> CachedDatabaseManager:
+        """Returns the open handle for a user's shard, opening (and creating) it on first use."""
+        path: Path = self.shard_path(user_id)
+        evicted: List[CachedDatabaseManager] = []
+        with self._lock:
+            db: Optional[CachedDatabaseManager] = self._open.get(path)
+            if db is not None:
+                self._open.move_to_end(path)
+                return db
+            db = self._open[path] = CachedDatabaseManager(path)
+            while len(self._open) > self.max_open:
+                evicted.append(self._open.popitem(last=False)[1])
+        for old in evicted:
+            self._close(old)
+        return db
+
+    @staticmethod
+    def _close(db: DatabaseManager) -> None:
+        # Sessions still holding the handle keep working; they just lose pooled connections
+        db._writes.cancel()
+        db.flush_writes()
+        close_connection_pool(db.db_path, db._pool)
+
+    def close(self) -> None:
+        with self._lock:
+            handles: List[CachedDatabaseManager] = list(self._open.values())
+            self._open.clear()
+        for db in handles:
+            self._close(db)
+
+    def iter_shards(self) -> Iterator[Path]:
+        """Every shard file on disk, open or not."""
+        return iter(sorted(self.root.glob("*.db")))
+
+    # --- CROSS-SHARD ---
+    def aggregate(self, func: Callable[[DatabaseManager], T], max_workers: int = SHARD_AGGREGATE_WORKERS) -> Dict[str, T]:
+        """
+        Runs func against every shard in parallel (shards do not share locks) and returns
+        {shard name: result}. Open handles are reused; other shards are opened only for the call,
+        and their pool is closed afterwards unless get() has meanwhile opened the shard on it.
+        """
+        def run(path: Path) -> T:
+            with self._lock:
+                db: Optional[DatabaseManager] = self._open.get(path)
+            if db is not None:
+                return func(db)
+            db = DatabaseManager(path)
+            try:
+                return func(db)
+            finally:
+                with self._lock:  # get() opens handles under this lock, so it cannot adopt the pool mid-close
+                    if path not in self._open:
+                        close_connection_pool(path, db._pool)
+
+        paths: List[Path] = list(self.iter_shards())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip((path.stem for path in paths), executor.map(run, paths)))
+
+    def admin_summary(self) -> List[Dict[str, Any]]:
+        """Per-shard totals for admin reporting, plus a final "TOTAL" row."""
+        def summarize(db: DatabaseManager) -> Dict[str, Any]:
+            return {
+                "tasks": db.count_tasks(),
+                "completed": db.count_tasks(completed=True),
+                "focus_minutes": sum(row["minutes"] or 0 for row in db.get_focus_stats()),
+                "size_kb": round(sum(f.stat().st_size for f in db.db_path.parent.glob(f"{db.db_path.name}*")) / 1024, 1),
+            }
+
+        rows: List[Dict[str, Any]] = [{"shard": name, **totals} for name, totals in self.aggregate(summarize).items()]
+        if rows:
+            rows.append({"shard": "TOTAL", **{key: round(sum(row[key] for row in rows), 1) for key in ("tasks", "completed", "focus_minutes", "size_kb")}})
+        return rows
+
+
+@lru_cache(maxsize=None)
+def get_router() -> StorageRouter:
+    """Returns the process-wide storage router."""
+    return StorageRouter()
+
+
+def proxy_user_id(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    The user named by the reverse proxy's SHARD_USER_HEADER. Clients can send that header
+    themselves, so it is ignored unless SHARD_TRUST_USER_HEADER says a proxy sets it.
+    """
+    if not SHARD_TRUST_USER_HEADER:
+        return None
+    return headers.get(SHARD_USER_HEADER) or None
+
+
+def current_user_id() -> Optional[str]:
+    """The signed-in user (Streamlit auth), else the user named by a trusted proxy header, else None."""
+    import streamlit as st
+    try:
+        if st.user.get("is_logged_in") and st.user.get("email"):
+            return str(st.user["email"])
+    except Exception:
+        pass  # Auth is not configured
+    return proxy_user_id(st.context.headers)
+
+
+def get_session_database() -> CachedDatabaseManager:
+    """
+    The database for the current Streamlit session: the user's shard when sharding is enabled
+    and the user is known, otherwise the shared database at DB_PATH.
+    """
+    if SHARDING_ENABLED:
+        user_id: Optional[str] = current_user_id()
+        if user_id:
+            return get_router().get(user_id)
+    return get_database()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shard maintenance commands.")
+    parser.add_argument("command", choices=["summary", "locate"])
+    parser.add_argument("--user", help="User id (for locate)")
+    args = parser.parse_args()
+
+    router: StorageRouter = StorageRouter()
+    if args.command == "summary":
+        for row in router.admin_summary():
+            print(f"{row['shard']:<60} {row['tasks']:>8} tasks {row['completed']:>8} done {row['focus_minutes']:>8} focus min {row['size_kb']:>10} KB")
+    elif args.command == "locate":
+        if not args.user:
+            parser.error("locate needs --user")
+        print(router.shard_path(args.user))
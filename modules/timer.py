@@ -0,0 +1,137 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from modules.database import DatabaseManager
+
+# Timer lifecycle: running <-> paused, then completed or abandoned (terminal)
+ACTIVE_STATES = ("running", "paused")
+TERMINAL_STATES = ("completed", "abandoned")
+
+
+class InvalidTimerTransition(ValueError):
+    """Raised when an action is not allowed from the timer's current state."""
+
+
+def focus_minutes(elapsed_seconds: float) -> int:
+    """Minutes logged for a focus session that ran elapsed_seconds (at least 1)."""
+    return max(1, int(elapsed_seconds) // 60)
+
+
+@dataclass
+class TimerSnapshot:
+    """Point-in-time view of a persisted timer."""
+    id: str
+    task_id: Optional[str]
+    mode: str
+    state: str
+    duration_seconds: int
+    elapsed_seconds: float
+    resumed_at: Optional[float]
+    started_at: float
+    logged: bool
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "TimerSnapshot":
+        return cls(
+            id=row["id"],
+            task_id=row["task_id"],
+            mode=row["mode"],
+            state=row["state"],
+            duration_seconds=row["duration_seconds"],
+            elapsed_seconds=row["elapsed_seconds"],
+            resumed_at=row["resumed_at"],
+            started_at=row["started_at"],
+            logged=bool(row["logged"]),
+        )
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        """Seconds spent running, excluding pauses (capped at the duration)."""
+        elapsed: float = self.elapsed_seconds
+        if self.state == "running" and self.resumed_at is not None:
+            elapsed += (now if now is not None else time.time()) - self.resumed_at
+        return min(elapsed, self.duration_seconds)
+
+    def remaining_seconds(self, now: Optional[float] = None) -> int:
+        """Whole seconds left, reconstructed from the stored timestamps."""
+        return max(0, math.ceil(self.duration_seconds - self.elapsed(now)))
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def logged_minutes(self) -> Optional[int]:
+        """Minutes this timer logged as a focus session, or None if it logged nothing."""
+        return focus_minutes(self.elapsed_seconds) if self.logged else None
+
+
+class FocusTimer:
+    """
+    State machine for pomodoro/break timers persisted in the active_timers table,
+    so an in-flight timer survives reruns, browser reloads and server restarts.
+    Focus timers log their session through the focus_sessions tables exactly once.
+    """
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db: DatabaseManager = db
+
+    def _load(self, timer_id: str) -> TimerSnapshot:
+        row: Optional[Dict[str, Any]] = self.db.get_timer(timer_id)
+        if row is None:
+            raise KeyError(f"Unknown timer: {timer_id}")
+        return TimerSnapshot.from_row(row)
+
+    def get(self, timer_id: str) -> Optional[TimerSnapshot]:
+        """Returns the timer, completing (and logging) it first if its time has run out."""
+        row: Optional[Dict[str, Any]] = self.db.get_timer(timer_id)
+        if row is None:
+            return None
+        timer: TimerSnapshot = TimerSnapshot.from_row(row)
+        if timer.state == "running" and timer.remaining_seconds() == 0:
+            self.complete(timer_id)
+            timer = self._load(timer_id)
+        return timer
+
+    def start(self, duration_minutes: int, mode: str = "Focus", task_id: Optional[str] = None) -> TimerSnapshot:
+        """Creates and starts a new timer."""
+        now: float = time.time()
+        timer_id: str = self.db.create_timer(task_id, mode, duration_minutes * 60, now)
+        return self._load(timer_id)
+
+    def pause(self, timer_id: str) -> TimerSnapshot:
+        """running -> paused, banking the time run so far."""
+        now: float = time.time()
+        timer: TimerSnapshot = self._load(timer_id)
+        if timer.state != "running" or not self.db.update_timer(timer_id, ["running"], "paused", timer.elapsed(now), None, now):
+            raise InvalidTimerTransition(f"Cannot pause a {timer.state} timer")
+        return self._load(timer_id)
+
+    def resume(self, timer_id: str) -> TimerSnapshot:
+        """paused -> running."""
+        now: float = time.time()
+        timer: TimerSnapshot = self._load(timer_id)
+        if timer.state != "paused" or not self.db.update_timer(timer_id, ["paused"], "running", timer.elapsed_seconds, now, now):
+            raise InvalidTimerTransition(f"Cannot resume a {timer.state} timer")
+        return self._load(timer_id)
+
+    def complete(self, timer_id: str) -> Optional[int]:
+        """
+        running/paused -> completed. Focus timers log the minutes actually run (at least 1).
+        Returns the logged minutes, or None if nothing was logged by this call.
+        """
+        now: float = time.time()
+        timer: TimerSnapshot = self._load(timer_id)
+        if not timer.is_active:
+            return None
+        elapsed: float = timer.elapsed(now)
+        minutes: Optional[int] = focus_minutes(elapsed) if timer.mode == "Focus" else None
+        if not self.db.finish_timer(timer_id, "completed", elapsed, minutes, now):
+            return None # Another rerun or session finished it first
+        return minutes
+
+    def abandon(self, timer_id: str) -> None:
+        """running/paused -> abandoned, without logging."""
+        now: float = time.time()
+        timer: TimerSnapshot = self._load(timer_id)
+        if timer.is_active:
+            self.db.finish_timer(timer_id, "abandoned", timer.elapsed(now), None, now)
@@ -1,131 +1,248 @@
 import streamlit as st
+import math
 import time
-from modules.database import DatabaseManager
-from modules.execution import ExecutionEngine
-from modules.groq_client import GroqClient
-from config.settings import TARGET_DAILY_MINUTES, TARGET_DAILY_HOURS, PRIORITY_COLORS, TASK_CATEGORIES
-from typing import List, Dict, Any
+from modules.context_builder import ContextBuilder
+from modules.data_cache import CachedDatabaseManager
+from modules.execution import DaySchedule, ExecutionEngine, TaskScheduler
+from modules.groq_client import get_groq_client
+from modules.instrumentation import PageRun, start_page_run
+from modules.records import Task
+from modules.storage_router import get_session_database
+from config.settings import Settings, get_settings, PLAN_PAGE_SIZES, PLAN_DEFAULT_PAGE_SIZE
+from typing import List, Dict, Any, Optional, Set
+
+# Columns shown by the bulk-edit grid ("id" is hidden and only used to match rows)
+BULK_EDIT_COLUMNS: List[str] = ["id", "completed", "name", "priority", "duration", "category", "notes"]
+
+
+def is_blank(value: Any) -> bool:
+    """True for a cell the grid left empty (None, NaN or whitespace)."""
+    return value is None or (isinstance(value, float) and math.isnan(value)) or (isinstance(value, str) and not value.strip())
+
+
+def normalize_bulk_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    A bulk-edit row with the types the database expects (empty notes become "").
+    Returns None if a required cell (name, priority, duration, category) was cleared.
+    """
+    if any(is_blank(row.get(k)) for k in ("name", "priority", "duration", "category")):
+        return None
+    return {
+        **row,
+        "completed": not is_blank(row.get("completed")) and bool(row["completed"]),
+        "name": row["name"].strip(),
+        "duration": int(row["duration"]),
+        "notes": "" if is_blank(row.get("notes")) else row["notes"],
+    }
+
 
 st.set_page_config(page_title="Plan Your Day", page_icon="📝", layout="wide")
+page_run: PageRun = start_page_run("Plan")
+try:
+    # --- Initialization ---
+    settings: Settings = get_settings()
+    task_categories: List[str] = list(settings.task_categories)
+    db: CachedDatabaseManager = get_session_database() # The user's shard when sharding is enabled
+    execution_engine: ExecutionEngine = ExecutionEngine()
+
+    st.title("📝 Daily Planning")
+
+    # --- SIDEBAR: ADD TASK ---
+    with st.sidebar:
+        st.header("Add New Task")
+        with st.form("add_task_form", clear_on_submit=True):
+            new_task_name: str = st.text_input("Task Name", placeholder="e.g. Deep Work on Project X")
+            new_task_priority: str = st.selectbox("Priority", settings.priorities, index=1)
+            new_task_duration: int = st.number_input("Duration (mins)", min_value=5, value=30, step=5)
+            new_task_category: str = st.selectbox("Category", task_categories, index=task_categories.index("Uncategorized"))
+            new_task_notes: str = st.text_area("Notes", placeholder="Optional details, links, context...")
+
+            submitted: bool = st.form_submit_button("Add Task")
+            if submitted and new_task_name:
+                db.add_task(new_task_name, new_task_priority, new_task_duration, new_task_category, new_task_notes)
+                st.success("Task Added!")
+                time.sleep(0.5)
+                st.rerun()
 
-# --- Initialization ---
-db: DatabaseManager = DatabaseManager()
-execution_engine: ExecutionEngine = ExecutionEngine()
-groq_client: GroqClient = GroqClient()
-
-st.title("📝 Daily Planning")
-
-# --- SIDEBAR: ADD TASK ---
-with st.sidebar:
-    st.header("Add New Task")
-    with st.form("add_task_form", clear_on_submit=True):
-        new_task_name: str = st.text_input("Task Name", placeholder="e.g. Deep Work on Project X")
-        new_task_priority: str = st.selectbox("Priority", list(PRIORITY_COLORS.keys()), index=1)
-        new_task_duration: int = st.number_input("Duration (mins)", min_value=5, value=30, step=5)
-        new_task_category: str = st.selectbox("Category", TASK_CATEGORIES, index=TASK_CATEGORIES.index("Uncategorized"))
-        
-        submitted: bool = st.form_submit_button("Add Task")
-        if submitted and new_task_name:
-            db.add_task(new_task_name, new_task_priority, new_task_duration, new_task_category)
-            st.success("Task Added!")
-            time.sleep(0.5)
-            st.rerun()
-
-# --- MAIN CONTENT ---
-
-# 1. Fetch & Sort
-tasks: List[Dict[str, Any]] = db.get_tasks()
-sorted_tasks: List[Dict[str, Any]] = execution_engine.prioritize_tasks(tasks)
-
-# 2. Capacity Indicator
-total_minutes: int = execution_engine.calculate_capacity(tasks)
-encoded_hours: float = total_minutes / 60
-capacity_percentage: float = min(total_minutes / TARGET_DAILY_MINUTES, 1.0)
-
-col_cap1, col_cap2 = st.columns([3, 1])
-with col_cap1:
-    st.progress(capacity_percentage, text=f"Daily Load: {int(encoded_hours)}h {total_minutes%60}m / {TARGET_DAILY_HOURS}h Target")
-with col_cap2:
-    if total_minutes > TARGET_DAILY_MINUTES:
-        st.warning("⚠️ Over Capacity!", icon="🔥")
-    else:
-        st.success("✅ Good Balance", icon="🧘")
-
-st.divider()
-
-# 3. Task List (Editable)
-st.subheader(f"Today's Tasks ({len(tasks)})")
-
-if not sorted_tasks:
-    st.info("No tasks yet. Use the sidebar to add some!")
-
-for task in sorted_tasks:
-    t_id: str = task["id"]
-    
-    if f"edit_mode_{t_id}" not in st.session_state:
-        st.session_state[f"edit_mode_{t_id}"] = False
-
-    container = st.container(border=True)
-    with container:
-        if not st.session_state[f"edit_mode_{t_id}"]:
-            c1, c2, c3, c4, c5, c6 = st.columns([0.5, 3, 1.5, 1, 1, 1]) # Added one more column for category
-            
-            with c1:
-                is_done: bool = bool(task["completed"])
-                new_status: bool = st.checkbox("", value=is_done, key=f"check_{t_id}")
-                if new_status != is_done:
-                    db.update_task_status(t_id, new_status)
-                    st.rerun()
+    # --- MAIN CONTENT ---
 
-            with c2:
-                title_style = "text-decoration: line-through; color: grey;" if task["completed"] else "font-weight: bold;"
-                st.markdown(f"<span style='{title_style}'>{task['name']}</span>", unsafe_allow_html=True)
-            
-            with c3:
-                color = PRIORITY_COLORS.get(task['priority'], 'grey')
-                st.markdown(f":{color}[{task['priority']}]")
+    # 1. Fetch (the shared scheduler is kept in order incrementally as tasks change; pages are sliced from it)
+    scheduler: TaskScheduler = db.get_scheduler()
 
-            with c4:
-                st.caption(f"⏱️ {task['duration']}m")
+    # 2. Capacity Indicator
+    total_minutes: int = scheduler.remaining_capacity
+    encoded_hours: float = total_minutes / 60
+    capacity_percentage: float = min(total_minutes / settings.target_daily_minutes, 1.0)
 
-            with c5: # Display Category
-                st.caption(f"📂 {task.get('category', 'Uncategorized')}") # Use .get for backward compatibility
+    col_cap1, col_cap2 = st.columns([3, 1])
+    with col_cap1:
+        st.progress(capacity_percentage, text=f"Daily Load: {int(encoded_hours)}h {total_minutes%60}m / {settings.target_daily_hours}h Target")
+    with col_cap2:
+        if total_minutes > settings.target_daily_minutes:
+            st.warning("⚠️ Over Capacity!", icon="🔥")
+        else:
+            st.success("✅ Good Balance", icon="🧘")
 
-            with c6:
-                b1, b2 = st.columns(2)
-                if b1.button("✏️", key=f"btn_edit_{t_id}", help="Edit Task"):
-                    st.session_state[f"edit_mode_{t_id}"] = True
-                    st.rerun()
-                if b2.button("🗑️", key=f"btn_del_{t_id}", help="Delete Task"):
-                    db.delete_task(t_id)
-                    st.rerun()
-        
-        else: # Edit View
-            with st.form(f"edit_form_{t_id}"):
-                c1, c2, c3, c4 = st.columns([3, 1, 1, 1]) # Added one more column for category
-                new_name = c1.text_input("Name", value=task["name"])
-                new_prio = c2.selectbox("Priority", list(PRIORITY_COLORS.keys()), index=list(PRIORITY_COLORS.keys()).index(task["priority"]))
-                new_dur = c3.number_input("Mins", value=task["duration"], step=5)
-                new_cat = c4.selectbox("Category", TASK_CATEGORIES, index=TASK_CATEGORIES.index(task.get("category", "Uncategorized"))) # Use .get
-                
-                if st.form_submit_button("💾 Save"):
-                    db.update_task_details(t_id, new_name, new_prio, new_dur, new_cat)
-                    st.session_state[f"edit_mode_{t_id}"] = False
-                    st.rerun()
-            
-            if st.button("Cancel", key=f"cancel_{t_id}"):
-                st.session_state[f"edit_mode_{t_id}"] = False
+    st.divider()
+
+    # 3. Task List (Editable), or full-text search results. Only the visible page is rendered.
+    search_query: str = st.text_input("🔍 Search tasks", placeholder="Search names and notes (prefixes work, e.g. deep wor)")
+    if search_query:
+        visible_tasks: List[Task] = db.search_tasks(search_query)
+        st.subheader(f"Search Results ({len(visible_tasks)})")
+        if not visible_tasks:
+            st.info("No tasks match your search.")
+    else:
+        total_tasks: int = len(scheduler)
+        st.subheader(f"Today's Tasks ({total_tasks})")
+        if not total_tasks:
+            st.info("No tasks yet. Use the sidebar to add some!")
+
+        nav1, nav2, nav3 = st.columns([1, 1, 2])
+        page_size: int = nav1.selectbox("Tasks per page", PLAN_PAGE_SIZES, index=PLAN_PAGE_SIZES.index(PLAN_DEFAULT_PAGE_SIZE))
+        page_count: int = max(1, math.ceil(total_tasks / page_size))
+        if st.session_state.get("plan_page", 1) > page_count: # The list shrank (deletes, smaller pages)
+            st.session_state["plan_page"] = page_count
+        page_number: int = nav2.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="plan_page")
+        view_mode: str = nav3.radio("View", ["List", "Bulk edit"], horizontal=True)
+        visible_tasks = scheduler.ordered(offset=(page_number - 1) * page_size, limit=page_size)
+
+    # Edit mode is only stored for tasks being edited; drop keys for tasks that left the page (or were deleted)
+    visible_ids: Set[str] = {task.id for task in visible_tasks}
+    for key in [k for k in st.session_state if isinstance(k, str) and k.startswith("edit_mode_")]:
+        if key[len("edit_mode_"):] not in visible_ids:
+            del st.session_state[key]
+
+    if not search_query and view_mode == "Bulk edit":
+        # One grid widget for the whole page instead of ~8 widgets per task
+        priorities: List[str] = settings.priorities
+        page_rows: List[Dict[str, Any]] = [
+            {**{k: row[k] for k in BULK_EDIT_COLUMNS}, "notes": row["notes"] or ""}
+            for row in (t.to_dict() for t in visible_tasks)
+        ]
+        edited_rows: List[Dict[str, Any]] = st.data_editor(
+            page_rows,
+            column_config={
+                "id": None,
+                "completed": st.column_config.CheckboxColumn("Done"),
+                "name": st.column_config.TextColumn("Name", required=True),
+                "priority": st.column_config.SelectboxColumn("Priority", options=priorities, required=True),
+                "duration": st.column_config.NumberColumn("Mins", min_value=5, step=5, required=True),
+                "category": st.column_config.SelectboxColumn("Category", options=task_categories, required=True),
+                "notes": st.column_config.TextColumn("Notes"),
+            },
+            disabled=["id"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"bulk_editor_{page_number}_{page_size}",
+        )
+        if st.button("💾 Save Changes"):
+            changed: int = 0
+            skipped: List[str] = []
+            for original, row in zip(page_rows, edited_rows):
+                edited: Optional[Dict[str, Any]] = normalize_bulk_row(row)
+                if edited is None:
+                    skipped.append(original["name"])
+                    continue
+                if edited["completed"] != original["completed"]:
+                    db.queue_task_status(original["id"], edited["completed"])
+                    changed += 1
+                if any(edited[k] != original[k] for k in ("name", "priority", "duration", "category", "notes")):
+                    db.queue_task_details(original["id"], edited["name"], edited["priority"], edited["duration"], edited["category"], edited["notes"])
+                    changed += 1
+            db.flush_writes() # All edits on the page commit in one transaction
+            st.success(f"Saved {changed} change(s).")
+            if skipped: # Keep the grid (and its edits) on screen so the empty cells can be filled in
+                st.warning(f"Not saved, a required field is empty: {', '.join(skipped)}")
+            else:
+                time.sleep(0.5)
                 st.rerun()
+        visible_tasks = []
+
+    for task in visible_tasks:
+        t_id: str = task.id
+
+        container = st.container(border=True)
+        with container:
+            if not st.session_state.get(f"edit_mode_{t_id}", False):
+                c1, c2, c3, c4, c5, c6 = st.columns([0.5, 3, 1.5, 1, 1, 1]) # Added one more column for category
+
+                with c1:
+                    is_done: bool = task.completed
+                    new_status: bool = st.checkbox("Done", value=is_done, key=f"check_{t_id}", label_visibility="collapsed")
+                    if new_status != is_done:
+                        db.queue_task_status(t_id, new_status) # Committed in the background, batched with nearby clicks
+                        st.rerun()
+
+                with c2:
+                    title_style = "text-decoration: line-through; color: grey;" if task.completed else "font-weight: bold;"
+                    st.markdown(f"<span style='{title_style}'>{task.name}</span>", unsafe_allow_html=True)
+                    if task.notes:
+                        st.caption(task.notes)
+
+                with c3:
+                    color = settings.priority_color(task.priority)
+                    st.markdown(f":{color}[{task.priority}]")
+
+                with c4:
+                    st.caption(f"⏱️ {task.duration}m")
+
+                with c5: # Display Category
+                    st.caption(f"📂 {task.category or 'Uncategorized'}")
+
+                with c6:
+                    b1, b2 = st.columns(2)
+                    if b1.button("✏️", key=f"btn_edit_{t_id}", help="Edit Task"):
+                        st.session_state[f"edit_mode_{t_id}"] = True
+                        st.rerun()
+                    if b2.button("🗑️", key=f"btn_del_{t_id}", help="Delete Task"):
+                        db.delete_task(t_id)
+                        st.rerun()
+
+            else: # Edit View
+                with st.form(f"edit_form_{t_id}"):
+                    c1, c2, c3, c4 = st.columns([3, 1, 1, 1]) # Added one more column for category
+                    new_name = c1.text_input("Name", value=task.name)
+                    new_prio = c2.selectbox("Priority", settings.priorities, index=settings.priorities.index(task.priority))
+                    new_dur = c3.number_input("Mins", value=task.duration, step=5)
+                    new_cat = c4.selectbox("Category", task_categories, index=task_categories.index(task.category or "Uncategorized"))
+                    new_notes = st.text_area("Notes", value=task.notes or "")
+
+                    if st.form_submit_button("💾 Save"):
+                        db.update_task_details(t_id, new_name, new_prio, new_dur, new_cat, new_notes)
+                        del st.session_state[f"edit_mode_{t_id}"]
+                        st.rerun()
+
+                if st.button("Cancel", key=f"cancel_{t_id}"):
+                    del st.session_state[f"edit_mode_{t_id}"]
+                    st.rerun()
+
+    # 4. Time-Blocked Schedule (computed locally in milliseconds)
+    st.divider()
+    st.subheader("🗓️ Today's Schedule")
+    schedule: DaySchedule = execution_engine.plan_day(
+        scheduler,
+        day_minutes=settings.target_daily_minutes,
+        pomodoro=settings.pomodoro_duration,
+        short_break=settings.short_break_duration,
+        long_break=settings.long_break_duration,
+        long_break_every=settings.pomodoros_before_long_break,
+    )
+    if not schedule.blocks:
+        st.info("No pending tasks to schedule!")
+    else:
+        st.caption(f"{schedule.focus_minutes}m of focus scheduled out of {schedule.focus_capacity}m available · {schedule.deferred} task(s) deferred")
+        st.dataframe(schedule.to_rows(), hide_index=True, use_container_width=True)
 
-# 4. AI Planning
-st.divider()
-st.subheader("🤖 AI Planner Assistant")
-if st.button("🔮 Generate Today's Execution Plan"):
-    with st.spinner("Consulting the architect..."):
-        todo_tasks = [t for t in sorted_tasks if not t["completed"]]
-        if not todo_tasks:
+    # 5. AI Planning
+    st.subheader("🤖 AI Planner Assistant")
+    if st.button("🔮 Generate Today's Execution Plan"):
+        if not schedule.blocks:
             st.info("No pending tasks to plan!")
         else:
-            context = "\n".join([f"- {t['name']} ({t['priority']}, {t['duration']}m, Category: {t.get('category', 'Uncategorized')})" for t in todo_tasks])
-            plan = groq_client.get_completion("daily_planning", user_context=context, target_daily_hours=TARGET_DAILY_HOURS)
-            st.markdown(plan)
+            # Deferred tasks are listed within the token budget and the rest summarized per category
+            prompt_args: Dict[str, Any] = ContextBuilder(execution_engine).daily_planning(schedule, settings.target_daily_hours)
+            # The model only narrates the precomputed schedule; tokens render as they arrive
+            st.write_stream(get_groq_client().stream_completion("daily_planning", **prompt_args))
+finally:
+    page_run.stop()
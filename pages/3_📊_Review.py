@@ -1,79 +1,132 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 from modules.database import DatabaseManager
-from config.settings import STATUS_COLORS
-from typing import List, Dict, Any
+from modules.analytics import ReviewReport, get_review_analytics
+from modules.groq_client import get_groq_client
+from modules.habits import HabitStore, HabitSummary, get_habit_store
+from modules.instrumentation import PageRun, start_page_run
+from modules.storage_router import get_session_database
+from components.charts import render_habit_chart
+from typing import List
+from config.settings import Settings, get_settings
 
 st.set_page_config(page_title="Review", page_icon="📊")
-db: DatabaseManager = DatabaseManager()
-
-st.title("📊 Weekly Review")
-
-# 1. Fetch Data
-focus_stats: List[Dict[str, Any]] = db.get_focus_stats()
-tasks: List[Dict[str, Any]] = db.get_tasks()
-
-# 2. Key Metrics
-col1, col2, col3 = st.columns(3)
-completed_count: int = sum(1 for t in tasks if t["completed"])
-total_count: int = len(tasks)
-completion_rate: int = int((completed_count / total_count * 100)) if total_count > 0 else 0
-
-total_focus: int = sum(s["minutes"] for s in focus_stats)
-
-col1.metric("Tasks Completed", f"{completed_count}/{total_count}")
-col2.metric("Completion Rate", f"{completion_rate}%")
-col3.metric("Total Focus Time", f"{total_focus} m")
-
-st.divider()
-
-# 3. Focus Chart
-if not focus_stats:
-    st.info("No focus sessions logged yet. Go to the Focus page and complete a timer!")
-else:
-    df_focus = pd.DataFrame(focus_stats)
-    
-    chart = alt.Chart(df_focus).mark_bar().encode(
-        x=alt.X('date', title='Date'),
-        y=alt.Y('minutes', title='Minutes Focused'),
-        tooltip=['date', 'minutes']
-    ).properties(
-        title="Daily Focus Minutes"
-    )
-    
-    st.altair_chart(chart, use_container_width=True)
-
-# 4. Task Breakdown by Status
-st.subheader("Task Status Breakdown")
-if tasks:
-    df_tasks = pd.DataFrame(tasks)
-    status_counts = df_tasks['completed'].value_counts().reset_index()
-    status_counts.columns = ['completed', 'count']
-    status_counts['status'] = status_counts['completed'].apply(lambda x: 'Done' if x else 'Todo')
-    
-    pie_status = alt.Chart(status_counts).mark_arc().encode(
-        theta=alt.Theta("count", stack=True),
-        color=alt.Color("status", scale=alt.Scale(domain=list(STATUS_COLORS.keys()), range=list(STATUS_COLORS.values()))),
-        tooltip=["status", "count"]
-    ).properties(
-        title="Tasks by Completion Status"
-    )
-    st.altair_chart(pie_status, use_container_width=True)
-
-# 5. Task Breakdown by Category
-st.subheader("Task Categories Breakdown")
-if tasks and 'category' in df_tasks.columns:
-    category_counts = df_tasks['category'].value_counts().reset_index()
-    category_counts.columns = ['category', 'count']
-    
-    pie_category = alt.Chart(category_counts).mark_arc().encode(
-        theta=alt.Theta("count", stack=True),
-        color=alt.Color("category"),
-        tooltip=["category", "count"]
-    ).properties(
-        title="Tasks by Category"
-    )
-    st.altair_chart(pie_category, use_container_width=True)
-elif tasks:
-    st.info("No categories found for tasks. Please add or update tasks with categories.")
+page_run: PageRun = start_page_run("Review")
+try:
+    settings: Settings = get_settings()
+    db: DatabaseManager = get_session_database()
+
+    st.title("📊 Weekly Review")
+
+    # 1. Fetch Data (one memoized report built from a few columnar queries)
+    report: ReviewReport = get_review_analytics(db).report()
+
+    # 2. Key Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Tasks Completed", f"{report.completion.completed}/{report.completion.total}")
+    col2.metric("Completion Rate", f"{int(report.completion.rate)}%")
+    col3.metric("Focus (Last 7 Days)", f"{report.this_week.minutes} m", delta=f"{report.this_week.minutes - report.last_week.minutes} m vs prior week")
+    col4.metric("Focus Streak", f"{report.streak.current} days", help=f"Longest streak: {report.streak.longest} days")
+
+    col5, col6, col7 = st.columns(3)
+    col5.metric("Focus (Last 30 Days)", f"{report.this_month.minutes} m")
+    col6.metric("Active Days (Last 30)", f"{report.this_month.active_days}")
+    col7.metric("Total Focus Time", f"{report.total_focus_minutes} m")
+
+    st.divider()
+
+    # 3. Focus Chart
+    if report.daily_focus.empty:
+        st.info("No focus sessions logged yet. Go to the Focus page and complete a timer!")
+    else:
+        chart = alt.Chart(report.daily_focus).mark_bar().encode(
+            x=alt.X('date:T', title='Date'),
+            y=alt.Y('minutes', title='Minutes Focused'),
+            tooltip=[alt.Tooltip('date:T'), 'minutes', 'sessions']
+        ).properties(
+            title="Daily Focus Minutes"
+        )
+
+        st.altair_chart(chart, use_container_width=True)
+
+    if not report.focus_by_category.empty:
+        c_left, c_right = st.columns(2)
+
+        category_focus_chart = alt.Chart(report.focus_by_category).mark_bar().encode(
+            x=alt.X('minutes', title='Minutes Focused'),
+            y=alt.Y('category', title='Category', sort='-x'),
+            tooltip=['category', 'minutes', 'sessions']
+        ).properties(
+            title="Focus by Category (Last 7 Days)"
+        )
+        c_left.altair_chart(category_focus_chart, use_container_width=True)
+
+        priority_focus_chart = alt.Chart(report.focus_by_priority).mark_bar().encode(
+            x=alt.X('minutes', title='Minutes Focused'),
+            y=alt.Y('priority', title='Priority', sort='-x'),
+            tooltip=['priority', 'minutes', 'sessions']
+        ).properties(
+            title="Focus by Priority (Last 7 Days)"
+        )
+        c_right.altair_chart(priority_focus_chart, use_container_width=True)
+
+    # 4. Task Breakdown by Status
+    st.subheader("Task Status Breakdown")
+    if report.completion.total:
+        statuses, status_colors = settings.status_scale()
+        pie_status = alt.Chart(report.tasks_by_status).mark_arc().encode(
+            theta=alt.Theta("count", stack=True),
+            color=alt.Color("status", scale=alt.Scale(domain=statuses, range=status_colors)),
+            tooltip=["status", "count"]
+        ).properties(
+            title="Tasks by Completion Status"
+        )
+        st.altair_chart(pie_status, use_container_width=True)
+        st.dataframe(report.completion_by_priority, hide_index=True, use_container_width=True)
+
+    # 5. Task Breakdown by Category
+    st.subheader("Task Categories Breakdown")
+    if report.completion.total:
+        pie_category = alt.Chart(report.tasks_by_category).mark_arc().encode(
+            theta=alt.Theta("count", stack=True),
+            color=alt.Color("category"),
+            tooltip=["category", "count"]
+        ).properties(
+            title="Tasks by Category"
+        )
+        st.altair_chart(pie_category, use_container_width=True)
+
+    # 6. Habits (streaks come from packed per-day bitsets, see modules/habits.py)
+    st.divider()
+    st.subheader("🔁 Habits")
+    habit_store: HabitStore = get_habit_store(db)
+
+    with st.form("add_habit_form", clear_on_submit=True):
+        h1, h2 = st.columns([4, 1])
+        new_habit_name: str = h1.text_input("New habit", placeholder="e.g. Meditate 10 minutes", label_visibility="collapsed")
+        if h2.form_submit_button("Add Habit") and new_habit_name:
+            habit_store.add_habit(new_habit_name)
+            st.rerun()
+
+    habits: List[HabitSummary] = habit_store.summaries()
+    if not habits:
+        st.info("No habits yet. Add one above and check in every day!")
+
+    for habit in habits:
+        c1, c2, c3, c4 = st.columns([0.5, 3, 2, 0.5])
+        done_today: bool = c1.checkbox("Done today", value=habit.done_today, key=f"habit_{habit.habit_id}", label_visibility="collapsed")
+        if done_today != habit.done_today:
+            habit_store.check_in(habit.habit_id, done=done_today)
+            st.rerun()
+        c2.markdown(f"**{habit.name}**")
+        c3.caption(f"🔥 {habit.current_streak} day streak · best {habit.longest_streak} · {habit.week_completed}/7 this week")
+        if c4.button("🗑️", key=f"habit_del_{habit.habit_id}", help="Delete Habit"):
+            habit_store.delete_habit(habit.habit_id)
+            st.rerun()
+
+    if habits:
+        render_habit_chart(habit_store.weekly_chart_data())
+        if st.button("🧠 Analyze My Habits"):
+            st.write_stream(get_groq_client().stream_completion("habit_tracking", habit_data=habit_store.prompt_data()))
+finally:
+    page_run.stop()
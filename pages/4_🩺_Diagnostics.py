@@ -0,0 +1,76 @@
+import streamlit as st
+from datetime import datetime
+from modules.instrumentation import RECORDER, Measurement
+from modules.llm_cache import get_response_cache
+from modules.storage_router import get_router
+from config.settings import SLOW_QUERY_MS, INSTRUMENTATION_BUFFER_SIZE, SHARDING_ENABLED
+from typing import List, Dict, Any
+
+st.set_page_config(page_title="Diagnostics", page_icon="🩺", layout="wide")
+
+st.title("🩺 Performance Diagnostics")
+st.caption(f"Timings from this server process (last {INSTRUMENTATION_BUFFER_SIZE} measurements).")
+
+if not RECORDER.enabled:
+    st.warning("Instrumentation is disabled (INSTRUMENTATION_ENABLED = False).")
+
+# 1. Page Runs
+st.subheader("Page Script Runs")
+page_summary: List[Dict[str, Any]] = RECORDER.summary("page")
+if page_summary:
+    st.dataframe(page_summary, hide_index=True, use_container_width=True)
+else:
+    st.info("No page runs recorded yet. Open the Plan, Focus or Review page.")
+
+# 2. Database
+st.subheader("Database Operations")
+db_summary: List[Dict[str, Any]] = RECORDER.summary("db")
+if db_summary:
+    st.dataframe(db_summary, hide_index=True, use_container_width=True)
+
+slow: List[Measurement] = RECORDER.slowest("db", threshold_ms=SLOW_QUERY_MS)
+st.markdown(f"**Slow queries** (≥ {SLOW_QUERY_MS} ms)")
+if slow:
+    st.dataframe([
+        {
+            "At": datetime.fromtimestamp(m.timestamp).strftime("%H:%M:%S"),
+            "Operation": m.name,
+            "ms": round(m.duration_ms, 2),
+            "Arguments": m.labels.get("args", ""),
+        }
+        for m in slow
+    ], hide_index=True, use_container_width=True)
+else:
+    st.caption("None 🎉")
+
+# 3. LLM
+st.subheader("Groq Calls")
+llm_calls: List[Measurement] = RECORDER.snapshot("llm")
+cache_stats: Dict[str, int] = get_response_cache().stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Calls (window)", len(llm_calls))
+c2.metric("Cache Hits", cache_stats["hits"])
+c3.metric("Cache Misses", cache_stats["misses"])
+c4.metric("Tokens (window)", sum(m.labels.get("prompt_tokens", 0) + m.labels.get("completion_tokens", 0) for m in llm_calls))
+llm_summary: List[Dict[str, Any]] = RECORDER.summary("llm")
+if llm_summary:
+    st.dataframe(llm_summary, hide_index=True, use_container_width=True)
+
+# 4. Shards (admin totals across every user's database)
+if SHARDING_ENABLED:
+    st.subheader("User Shards")
+    if st.button("Summarize Shards"):
+        shard_rows: List[Dict[str, Any]] = get_router().admin_summary()
+        if shard_rows:
+            st.dataframe(shard_rows, hide_index=True, use_container_width=True)
+        else:
+            st.info("No shards created yet.")
+
+# 5. Export
+st.divider()
+e1, e2, e3 = st.columns(3)
+e1.download_button("⬇️ JSON", RECORDER.export_json(), file_name="apex_metrics.json", mime="application/json")
+e2.download_button("⬇️ Prometheus", RECORDER.export_prometheus(), file_name="apex_metrics.prom", mime="text/plain")
+if e3.button("🧹 Clear Measurements"):
+    RECORDER.clear()
+    st.rerun()
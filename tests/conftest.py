@@ -0,0 +1,21 @@
+from pathlib import Path
+from typing import Iterator
+import pytest
+from modules.data_cache import CachedDatabaseManager
+from modules.database import close_connection_pool
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Iterator[Path]:
+    """A fresh database file; its connection pool is closed after the test."""
+    path: Path = tmp_path / "tasks.db"
+    yield path
+    close_connection_pool(path)
+
+
+@pytest.fixture
+def db(db_path: Path) -> CachedDatabaseManager:
+    """A CachedDatabaseManager whose write queue only flushes when the test asks for it."""
+    manager = CachedDatabaseManager(db_path)
+    manager._writes.interval = 3600
+    return manager
@@ -0,0 +1,56 @@
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+import pytest
+from modules.data_cache import CachedDatabaseManager
+
+pytest.importorskip("pyarrow")
+from modules.archive import TaskArchive  # noqa: E402
+
+TODAY: date = date(2024, 6, 30)
+
+
+def task(task_id: str, created_at: str, completed: bool, completed_at: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "id": task_id, "name": task_id, "priority": "High", "duration": 30, "completed": completed,
+        "created_at": created_at, "category": "Work", "completed_at": completed_at,
+    }
+
+
+@pytest.fixture
+def archive(db: CachedDatabaseManager, tmp_path: Path) -> TaskArchive:
+    db.add_tasks([
+        task("old-done", "2024-01-05T09:00:00", True, "2024-02-01T10:00:00"),
+        task("old-done-undated", "2024-01-06T09:00:00", True),  # Completed before completed_at existed
+        task("old-open", "2024-01-07T09:00:00", False),
+        task("recently-done", "2024-01-08T09:00:00", True, "2024-06-20T10:00:00"),
+    ])
+    with db.transaction() as conn:
+        db._log_focus_session(conn, "old-done", 25, "2024-02-01T09:00:00")
+        db._log_focus_session(conn, "old-open", 30, "2024-06-25T09:00:00")
+    return TaskArchive(db, tmp_path / "archive")
+
+
+def test_moves_old_rows_to_parquet(archive: TaskArchive, db: CachedDatabaseManager) -> None:
+    result = archive.archive(older_than_days=90, today=TODAY)
+    assert (result.tasks, result.sessions, result.rollup_rows) == (2, 1, 1)
+    assert {t.id for t in db.get_tasks()} == {"old-open", "recently-done"}
+    assert sum(day["minutes"] for day in db.get_focus_stats()) == 30
+    archived = archive.read("tasks")
+    assert sorted(archived["id"]) == ["old-done", "old-done-undated"]
+    assert archived["completed"].all()
+    assert list(archive.read("focus_sessions")["duration_minutes"]) == [25]
+    assert list(archive.read("focus_daily")["priority"]) == ["High"]
+
+
+def test_second_run_moves_nothing(archive: TaskArchive, db: CachedDatabaseManager) -> None:
+    archive.archive(older_than_days=90, today=TODAY)
+    result = archive.archive(older_than_days=90, today=TODAY)
+    assert (result.tasks, result.sessions, result.rollup_rows, result.files) == (0, 0, 0, 0)
+    assert len(archive.read("tasks")) == 2
+
+
+def test_read_skips_older_partitions(archive: TaskArchive) -> None:
+    archive.archive(older_than_days=90, today=TODAY)
+    assert list(archive.read("tasks", since="2024-02-01")["id"]) == ["old-done"]
+    assert archive.read("tasks", since="2024-03-01").empty
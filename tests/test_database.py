@@ -0,0 +1,24 @@
+import pytest
+from modules.data_cache import CachedDatabaseManager
+
+
+def test_transaction_commits_writes_and_versions(db: CachedDatabaseManager) -> None:
+    before = db.data_versions(("habits", "archive"))
+    with db.transaction(immediate=True) as conn:
+        conn.execute("INSERT INTO habits (id, name, created_at) VALUES ('h1', 'Read', '2024-01-01')")
+        db.bump_versions(conn, "habits", "archive")
+    assert db.data_versions(("habits", "archive")) == tuple(version + 1 for version in before)
+    with db.transaction() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM habits").fetchone()[0] == 1
+
+
+def test_transaction_rolls_back_on_error(db: CachedDatabaseManager) -> None:
+    before = db.data_versions(("habits",))
+    with pytest.raises(RuntimeError):
+        with db.transaction(immediate=True) as conn:
+            conn.execute("INSERT INTO habits (id, name, created_at) VALUES ('h1', 'Read', '2024-01-01')")
+            db.bump_versions(conn, "habits")
+            raise RuntimeError("abort")
+    assert db.data_versions(("habits",)) == before
+    with db.transaction() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM habits").fetchone()[0] == 0
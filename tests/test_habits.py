@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+from typing import Iterable, List
+from modules.data_cache import CachedDatabaseManager
+from modules.habits import HabitStore, count_between, current_streak, day_offset, is_done, longest_streak
+
+TODAY: date = date(2024, 3, 10)
+
+
+def bits_for(days: Iterable[date]) -> int:
+    bits: int = 0
+    for day in days:
+        bits |= 1 << day_offset(day)
+    return bits
+
+
+def days_ago(*offsets: int) -> List[date]:
+    return [TODAY - timedelta(days=offset) for offset in offsets]
+
+
+def test_current_streak_counts_back_from_today() -> None:
+    assert current_streak(bits_for(days_ago(0, 1, 2, 4)), TODAY) == 3
+    assert current_streak(bits_for(days_ago(1, 2)), TODAY) == 2  # Today is still open
+    assert current_streak(bits_for(days_ago(2, 3)), TODAY) == 0
+    assert current_streak(0, TODAY) == 0
+
+
+def test_longest_streak_and_counts() -> None:
+    bits: int = bits_for(days_ago(0, 1, 5, 6, 7, 8, 20))
+    assert longest_streak(bits) == 4
+    assert longest_streak(0) == 0
+    assert count_between(bits, TODAY - timedelta(days=6), TODAY + timedelta(days=1)) == 4  # Days 0, 1, 5 and 6
+    assert is_done(bits, TODAY) and not is_done(bits, TODAY - timedelta(days=2))
+
+
+def test_check_ins_across_a_year_boundary(db: CachedDatabaseManager) -> None:
+    store = HabitStore(db)
+    habit_id: str = store.add_habit("Stretch")
+    new_year = date(2024, 1, 1)
+    for offset in range(-3, 2):
+        store.check_in(habit_id, new_year + timedelta(days=offset))
+    store.check_in(habit_id, new_year + timedelta(days=1), done=False)
+    (summary,) = store.summaries(today=new_year + timedelta(days=1))
+    assert (summary.done_today, summary.current_streak, summary.longest_streak) == (False, 4, 4)
+    assert summary.total_checkins == 4
+    store.delete_habit(habit_id)
+    assert store.summaries(today=new_year) == []
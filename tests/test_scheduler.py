@@ -0,0 +1,75 @@
+import random
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, List
+import pytest
+from modules.execution import ExecutionEngine, TaskScheduler
+from modules.records import Task
+
+PRIORITIES: List[str] = ["High", "Medium", "Low"]
+
+
+def make_tasks(count: int, rng: random.Random) -> List[Task]:
+    return [
+        Task(
+            id=f"t{i}", name=f"Task {i}", priority=rng.choice(PRIORITIES),
+            duration=rng.choice([None, 15, 25, 30, 45, 60, 90]), completed=rng.random() < 0.3,
+            category=rng.choice(["Work", "Health", "Learning"]),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def engine() -> ExecutionEngine:
+    return ExecutionEngine()
+
+
+def test_incremental_updates_match_a_full_sort(engine: ExecutionEngine) -> None:
+    rng = random.Random(7)
+    tasks: Dict[str, Task] = {task.id: task for task in make_tasks(300, rng)}
+    scheduler: TaskScheduler = engine.build_scheduler(tasks.values())
+    for step in range(500):
+        task_id: str = rng.choice(list(tasks))
+        action: str = rng.choice(["complete", "update", "remove", "add"])
+        if action == "complete":
+            tasks[task_id] = replace(tasks[task_id], completed=not tasks[task_id].completed)
+            scheduler.complete(task_id, tasks[task_id].completed)
+        elif action == "update":
+            changes = {"priority": rng.choice(PRIORITIES), "duration": rng.choice([None, 10, 50])}
+            tasks[task_id] = replace(tasks[task_id], **changes)
+            scheduler.update(task_id, **changes)
+        elif action == "remove":
+            del tasks[task_id]
+            scheduler.remove(task_id)
+        else:
+            task = replace(make_tasks(1, rng)[0], id=f"new{step}")
+            tasks[task.id] = task
+            scheduler.add(task)
+    # Updates keep their insertion position among ties; new tasks go last, like the dict order
+    expected: List[Task] = engine.prioritize_tasks(list(tasks.values()))
+    assert [task.id for task in scheduler.ordered()] == [task.id for task in expected]
+    assert scheduler.remaining_capacity == engine.calculate_capacity(list(tasks.values()))
+    assert scheduler.incomplete_count == sum(not task.completed for task in tasks.values())
+
+
+def test_top_and_pages(engine: ExecutionEngine) -> None:
+    tasks: List[Task] = make_tasks(50, random.Random(1))
+    scheduler: TaskScheduler = engine.build_scheduler(tasks)
+    expected: List[Task] = engine.prioritize_tasks(tasks)
+    incomplete: List[Task] = [task for task in expected if not task.completed]
+    assert scheduler.top(5) == incomplete[:5]
+    assert scheduler.top() == incomplete
+    assert scheduler.top(len(tasks)) == incomplete
+    assert scheduler.ordered(10, 10) == expected[10:20]
+    assert scheduler.ordered(45, 10) == expected[45:]
+
+
+def test_plan_day_from_scheduler_matches_list(engine: ExecutionEngine) -> None:
+    tasks: List[Task] = make_tasks(200, random.Random(3))
+    start = datetime(2024, 1, 2, 9, 0)
+    from_list = engine.plan_day(tasks, start=start)
+    from_scheduler = engine.plan_day(engine.build_scheduler(tasks), start=start)
+    assert from_scheduler.blocks == from_list.blocks
+    assert from_scheduler.deferred == from_list.deferred
+    assert [task.id for task in from_scheduler.overflow] == [task.id for task in from_list.overflow]
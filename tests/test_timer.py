@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+from typing import List
+import pytest
+import modules.timer as timer_module
+from modules.data_cache import CachedDatabaseManager
+from modules.timer import FocusTimer, InvalidTimerTransition
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Replaces the timer's wall clock; tests advance it by changing clock[0]."""
+    now: List[float] = [1_700_000_000.0]
+    monkeypatch.setattr(timer_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def timers(db: CachedDatabaseManager) -> FocusTimer:
+    return FocusTimer(db)
+
+
+def logged_minutes(db: CachedDatabaseManager) -> int:
+    return sum(day["minutes"] for day in db.get_focus_stats())
+
+
+def test_pause_excludes_paused_time(timers: FocusTimer, db: CachedDatabaseManager, clock: List[float]) -> None:
+    timer = timers.start(25)
+    assert timer.state == "running"
+    clock[0] += 300
+    assert timers.pause(timer.id).state == "paused"
+    clock[0] += 3600
+    assert timers.get(timer.id).remaining_seconds(clock[0]) == 20 * 60
+    assert timers.resume(timer.id).state == "running"
+    clock[0] += 330
+    assert timers.complete(timer.id) == 10
+    assert timers.get(timer.id).state == "completed"
+    assert timers.get(timer.id).logged_minutes == 10
+    assert logged_minutes(db) == 10
+
+
+def test_invalid_transitions(timers: FocusTimer, clock: List[float]) -> None:
+    timer = timers.start(25)
+    with pytest.raises(InvalidTimerTransition):
+        timers.resume(timer.id)
+    timers.pause(timer.id)
+    with pytest.raises(InvalidTimerTransition):
+        timers.pause(timer.id)
+    timers.abandon(timer.id)
+    with pytest.raises(InvalidTimerTransition):
+        timers.resume(timer.id)
+    assert timers.get(timer.id).state == "abandoned"
+
+
+def test_complete_logs_once(timers: FocusTimer, db: CachedDatabaseManager, clock: List[float]) -> None:
+    timer = timers.start(25)
+    clock[0] += 10
+    assert timers.complete(timer.id) == 1  # At least a minute
+    assert timers.complete(timer.id) is None
+    assert logged_minutes(db) == 1
+
+
+def test_expired_timer_completes_on_read(timers: FocusTimer, db: CachedDatabaseManager, clock: List[float]) -> None:
+    timer = timers.start(25)
+    clock[0] += 3600
+    snapshot = timers.get(timer.id)
+    assert snapshot.state == "completed"
+    assert snapshot.logged_minutes == 25
+    assert logged_minutes(db) == 25
+
+
+def test_breaks_and_abandoned_timers_log_nothing(timers: FocusTimer, db: CachedDatabaseManager, clock: List[float]) -> None:
+    pause = timers.start(5, mode="Short Break")
+    clock[0] += 300
+    assert timers.complete(pause.id) is None
+    assert timers.get(pause.id).logged_minutes is None
+    focus = timers.start(25)
+    clock[0] += 600
+    timers.abandon(focus.id)
+    assert timers.get(focus.id).logged_minutes is None
+    assert logged_minutes(db) == 0
@@ -0,0 +1,64 @@
+"""
+Opens a database created with the original (baseline) schema, with tasks and focus sessions
+but none of the later tables or columns, and checks the migration in DatabaseManager._init_db.
+"""
+import sqlite3
+from pathlib import Path
+import pytest
+from modules.data_cache import CachedDatabaseManager
+
+# The schema as the first release created it
+BASELINE_SCHEMA: str = """
+CREATE TABLE tasks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    priority TEXT DEFAULT 'Medium',
+    duration INTEGER DEFAULT 30,
+    completed BOOLEAN DEFAULT 0,
+    created_at TEXT,
+    category TEXT DEFAULT 'Uncategorized'
+);
+CREATE TABLE focus_sessions (
+    id TEXT PRIMARY KEY,
+    task_id TEXT,
+    start_time TEXT,
+    duration_minutes INTEGER,
+    FOREIGN KEY(task_id) REFERENCES tasks(id)
+);
+INSERT INTO tasks VALUES ('t1', 'Write report', 'High', 45, 0, '2024-01-02T09:00:00', 'Work');
+INSERT INTO tasks VALUES ('t2', 'Gym', 'Low', 60, 1, '2024-01-02T10:00:00', 'Health');
+INSERT INTO focus_sessions VALUES ('s1', 't1', '2024-01-02T09:05:00', 25);
+INSERT INTO focus_sessions VALUES ('s2', 't1', '2024-01-03T09:05:00', 30);
+INSERT INTO focus_sessions VALUES ('s3', NULL, '2024-01-03T14:00:00', 15);
+"""
+
+
+@pytest.fixture
+def upgraded(db_path: Path) -> CachedDatabaseManager:
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    conn.close()
+    return CachedDatabaseManager(db_path)
+
+
+def test_schema_is_migrated(upgraded: CachedDatabaseManager) -> None:
+    assert upgraded._pool.schema_ready
+    with upgraded.transaction() as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    assert {"data_versions", "focus_daily_rollup", "active_timers", "habits", "habit_checkins"} <= tables
+    assert {"notes", "completed_at"} <= columns
+
+
+def test_focus_rollup_is_backfilled(upgraded: CachedDatabaseManager) -> None:
+    with upgraded.transaction() as conn:
+        rollup = conn.execute("SELECT SUM(minutes), SUM(sessions) FROM focus_daily_rollup").fetchone()
+    assert tuple(rollup) == (70, 3)
+    assert sum(day["minutes"] for day in upgraded.get_focus_stats()) == 70
+
+
+def test_existing_rows_stay_readable(upgraded: CachedDatabaseManager) -> None:
+    tasks = {task.id: task for task in upgraded.get_tasks()}
+    assert set(tasks) == {"t1", "t2"}
+    assert tasks["t1"].notes == ""
+    assert tasks["t2"].completed
@@ -0,0 +1,32 @@
+from modules.data_cache import CachedDatabaseManager
+
+
+def test_updates_to_one_task_coalesce(db: CachedDatabaseManager) -> None:
+    task_id: str = db.add_task("Write report", "Low", 30, "Work")
+    db.queue_task_details(task_id, "Write report", "Low", 45, "Work")
+    db.queue_task_details(task_id, "Write the report", "High", 50, "Work", notes="draft first")
+    db.queue_task_status(task_id, True)
+    assert db.flush_writes() == (1, 0)
+    task = db.get_task(task_id)
+    assert (task.name, task.priority, task.duration, task.notes, task.completed) == ("Write the report", "High", 50, "draft first", True)
+    assert db.flush_writes() == (0, 0)
+
+
+def test_queued_writes_are_read_back_before_the_flush(db: CachedDatabaseManager) -> None:
+    task_id: str = db.add_task("Gym", "Low", 60, "Health")
+    assert not db.get_tasks()[0].completed  # Cached before the write is queued
+    db.queue_task_status(task_id, True)
+    db.queue_focus_session(task_id, 25)
+    assert db.get_task(task_id).completed
+    assert db.get_tasks()[0].completed
+    assert db.get_scheduler().incomplete_count == 0
+    assert sum(day["minutes"] for day in db.get_focus_stats()) == 25
+    assert db.flush_writes() == (0, 0)  # The focus read had to flush
+
+
+def test_synchronous_write_supersedes_queued_value(db: CachedDatabaseManager) -> None:
+    task_id: str = db.add_task("Read", "Medium", 20, "Learning")
+    db.queue_task_status(task_id, True)
+    db.update_task_status(task_id, False)
+    assert db.flush_writes() == (0, 0)
+    assert not db.get_task(task_id).completed